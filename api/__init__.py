@@ -1,2 +1,4 @@
-from api.auth import router as auth_router
-from api.project import router as project_router
\ No newline at end of file
+from api.auth import router as auth_router, async_router as async_auth_router
+from api.project import router as project_router, async_router as async_project_router
+from api.user import router as user_router, async_router as async_user_router
+from api.metrics import router as metrics_router
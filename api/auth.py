@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, status
-from services.auth import AuthService
-from schemas.user import UserCreate, UserLogin, UserResponse, Token
+from fastapi import APIRouter, Depends, Request, status
+from services.auth import AuthService, AsyncAuthService
+from schemas.user import UserCreate, UserLogin, UserResponse, Token, RefreshRequest
+from core.rate_limit import auth_rate_limiter
+from models.user import User
+from typing import Optional
+from core.tracing import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(
-    user_data: UserCreate, 
-    auth_service: AuthService = Depends()
-) -> UserResponse:
-    user = auth_service.register_user(user_data)
+def _client_ip(request: Request) -> Optional[str]:
+    # The address uvicorn reports; X-Forwarded-For only counts from SERVER_FORWARDED_ALLOW_IPS
+    return request.client.host if request.client else None
+
+def _user_response(user: User) -> UserResponse:
     return UserResponse(
         id=user.id,
         username=user.username,
@@ -20,9 +23,71 @@ def register(
         created_at=user.created_at,
     )
 
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+def register(
+    user_data: UserCreate, 
+    request: Request,
+    auth_service: AuthService = Depends()
+) -> UserResponse:
+    auth_rate_limiter.check("register", _client_ip(request), user_data.username)
+    user = auth_service.register_user(user_data)
+    return _user_response(user)
+
 @router.post("/login", response_model=Token)
 def login(
     user_data: UserLogin,
+    request: Request,
     auth_service: AuthService = Depends()
 ) -> Token:
+    auth_rate_limiter.check("login", _client_ip(request), user_data.username)
     return auth_service.authenticate_user(user_data)
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    refresh_data: RefreshRequest,
+    auth_service: AuthService = Depends()
+) -> Token:
+    return auth_service.refresh(refresh_data.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    refresh_data: RefreshRequest,
+    auth_service: AuthService = Depends()
+) -> None:
+    auth_service.revoke_refresh_token(refresh_data.refresh_token)
+
+# Same routes served through AsyncAuthService when settings.DB_ASYNC is on
+async_router = APIRouter(route_class=ProfiledRoute)
+
+@async_router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_async(
+    user_data: UserCreate,
+    request: Request,
+    auth_service: AsyncAuthService = Depends()
+) -> UserResponse:
+    await auth_rate_limiter.check_async("register", _client_ip(request), user_data.username)
+    user = await auth_service.register_user(user_data)
+    return _user_response(user)
+
+@async_router.post("/login", response_model=Token)
+async def login_async(
+    user_data: UserLogin,
+    request: Request,
+    auth_service: AsyncAuthService = Depends()
+) -> Token:
+    await auth_rate_limiter.check_async("login", _client_ip(request), user_data.username)
+    return await auth_service.authenticate_user(user_data)
+
+@async_router.post("/refresh", response_model=Token)
+async def refresh_async(
+    refresh_data: RefreshRequest,
+    auth_service: AsyncAuthService = Depends()
+) -> Token:
+    return await auth_service.refresh(refresh_data.refresh_token)
+
+@async_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_async(
+    refresh_data: RefreshRequest,
+    auth_service: AsyncAuthService = Depends()
+) -> None:
+    await auth_service.revoke_refresh_token(refresh_data.refresh_token)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core import db, replicas as replica_routing
+from core.jobs import job_queue
+from core.rate_limit import auth_rate_limiter
+from core.search import project_search_index
+from core.snapshot import project_snapshot
+from core.security import token_cache
+from core.tracing import metrics
+from config.config import settings
+
+router = APIRouter()
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Request, span and query timings plus pool and token cache gauges, in the Prometheus text format
+    """
+    gauges = {}
+    for name, value in db.pool_status(db.engine).items():
+        if name != "pool":
+            gauges[f"db_pool_{name}"] = value
+    for name, value in token_cache.stats().items():
+        gauges[f"token_cache_{name}"] = value
+    for name, value in auth_rate_limiter.stats().items():
+        gauges[f"auth_rate_limit_{name}"] = value
+    for name, value in job_queue.stats().items():
+        gauges[f"job_queue_{name}"] = value
+    for name, value in project_search_index.stats().items():
+        gauges[f"project_search_index_{name}"] = value
+    for name, value in project_snapshot.stats().items():
+        gauges[f"project_snapshot_{name}"] = value
+    if replica_routing.replicas is not None:
+        healthy = [replica["healthy"] for replica in replica_routing.replicas.status()]
+        gauges["db_replicas_healthy"] = sum(healthy)
+        gauges["db_replicas_unhealthy"] = len(healthy) - sum(healthy)
+    return metrics.render(gauges)
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    """
+    Connection pool occupancy, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW
+    """
+    metrics = {"sync": db.pool_status(db.engine)}
+    if settings.DB_ASYNC:
+        metrics["async"] = db.pool_status(db.get_async_engine().sync_engine)
+    if replica_routing.replicas is not None:
+        metrics["replicas"] = [
+            {**status, **db.pool_status(engine)}
+            for status, engine in zip(replica_routing.replicas.status(), replica_routing.replicas.engines)
+        ]
+    return metrics
+
+@router.get("/token-cache")
+def token_cache_metrics():
+    """
+    Hit, miss and eviction counters of the verified-token cache
+    """
+    return token_cache.stats()
+
+@router.get("/rate-limit")
+def rate_limit_metrics():
+    """
+    Login and register attempts allowed and throttled by the auth rate limiter
+    """
+    return auth_rate_limiter.stats()
+
+@router.get("/jobs")
+def job_queue_metrics():
+    """
+    Deferred, processed, retried and failed background jobs, and the current queue depth
+    """
+    return job_queue.stats()
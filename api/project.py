@@ -1,11 +1,131 @@
-from fastapi import APIRouter, Depends, status
-from services.project import ProjectService
-from schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from core.dependencies import get_current_active_user, get_admin_user
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from services.project import ProjectService, AsyncProjectService
+from schemas.project import (
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectResponse,
+    ProjectBatchRequest,
+    ProjectBatchResponse,
+    ProjectCount,
+)
+from core.dependencies import (
+    get_current_active_user,
+    get_admin_user,
+    get_current_active_user_async,
+    get_admin_user_async,
+)
+from core.http import etag_matches, http_date, make_etag
+from core.pagination import decode_cursor, encode_cursor, page_response, page_size_for
+from core.snapshot import SnapshotPage
+from config.config import settings
 from models.user import User
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from core.tracing import ProfiledRoute, span
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+def _project_response(project: ProjectResponse, response: Response, if_none_match: Optional[str]):
+    # Validators come from updated_at, so a matching If-None-Match is answered
+    # without serializing the project again.
+    etag = make_etag(project.id, project.updated_at.strftime("%Y%m%d%H%M%S%f"))
+    headers = {"ETag": etag, "Last-Modified": http_date(project.updated_at)}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if settings.FAST_JSON:
+        # Already validated by the service; skip response_model re-validation
+        with span("serialize"):
+            body = project.model_dump_json()
+        return Response(body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return project
+
+def _snapshot_serves(owner_id: Optional[int], name_prefix: Optional[str], updated_since: Optional[datetime]) -> bool:
+    # Filtered listings still go to the database
+    return settings.PROJECT_SNAPSHOT_ENABLED and owner_id is None and not name_prefix and updated_since is None
+
+def _snapshot_response(page: SnapshotPage, headers: Dict[str, str]) -> Response:
+    if page.last_id is not None:
+        headers = {**headers, "X-Next-Cursor": encode_cursor(page.last_id)}
+    return Response(page.body, media_type="application/json", headers=headers)
+
+def _collection_validators(count: int, newest: Optional[datetime]) -> Dict[str, str]:
+    # Every page of a listing shares the collection's validators: any insert,
+    # delete or update changes the count or the newest updated_at. The URL
+    # (filters, cursor, limit) tells pages apart.
+    if newest is None:
+        return {"ETag": make_etag("projects", count)}
+    return {
+        "ETag": make_etag("projects", count, newest.strftime("%Y%m%d%H%M%S%f")),
+        "Last-Modified": http_date(newest),
+    }
+
+def _with_headers(result, response: Response, headers: Dict[str, str]):
+    # page_response returns either a ready Response or items for response_model
+    (result if isinstance(result, Response) else response).headers.update(headers)
+    return result
+
+def _search_window(limit: Optional[int], cursor: Optional[str]) -> Tuple[int, int]:
+    # Ranked results have no keyset to resume from, so the cursor is an offset
+    return page_size_for(limit), decode_cursor(cursor) or 0
+
+def _search_page(projects: List[ProjectResponse], page_size: int, offset: int, response: Response):
+    return page_response(projects, page_size, response, next_position=offset + len(projects))
+
+class _ProjectListing:
+    """
+    Request-level logic of GET /projects, shared by the sync and async routes.
+
+    Methods that read return the service call unawaited, so the two routes
+    differ only in awaiting them.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int],
+        cursor: Optional[str],
+        owner_id: Optional[int],
+        name_prefix: Optional[str],
+        updated_since: Optional[datetime],
+        if_none_match: Optional[str],
+    ):
+        self.limit = limit
+        self.page_size = page_size_for(limit)
+        self.after_id = decode_cursor(cursor)
+        self.filters = (owner_id, name_prefix, updated_since)
+        self.snapshot = _snapshot_serves(owner_id, name_prefix, updated_since)
+        self.if_none_match = if_none_match
+        self.headers: Dict[str, str] = {}
+
+    def stream(self, project_service) -> StreamingResponse:
+        return StreamingResponse(
+            project_service.stream_projects(self.limit, self.after_id, *self.filters),
+            media_type="application/x-ndjson",
+        )
+
+    def version(self, project_service):
+        if self.snapshot:
+            return project_service.get_snapshot_version()
+        return project_service.get_projects_version(*self.filters)
+
+    def not_modified(self, version: Tuple[int, Optional[datetime]]) -> Optional[Response]:
+        self.headers = _collection_validators(*version)
+        if etag_matches(self.if_none_match, self.headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+        return None
+
+    def page(self, project_service):
+        if self.snapshot:
+            return project_service.get_snapshot_page(self.page_size, self.after_id)
+        if settings.FAST_JSON:
+            return project_service.get_project_rows(self.page_size, self.after_id, *self.filters)
+        return project_service.get_projects(self.page_size, self.after_id, *self.filters)
+
+    def respond(self, page, response: Response):
+        if self.snapshot:
+            return _snapshot_response(page, self.headers)
+        return _with_headers(page_response(page, self.page_size, response), response, self.headers)
 
 @router.post("/projects", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 def create_project(
@@ -18,26 +138,94 @@ def create_project(
     """
     return project_service.create_project(project_data, current_user)
 
+@router.post("/projects:batch", response_model=ProjectBatchResponse)
+def batch_projects(
+    batch: ProjectBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    project_service: ProjectService = Depends()
+) -> ProjectBatchResponse:
+    """
+    Create, update and delete many projects in one transaction.
+
+    Each item gets its own status code: creates and deletes are admin only,
+    updates need admin or project ownership.
+    """
+    return project_service.batch(batch, current_user)
+
 @router.get("/projects", response_model=List[ProjectResponse])
 def get_projects(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    project_service: ProjectService = Depends()
+):
+    """
+    Get projects (for all users), one keyset page at a time.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    With stream=true the whole filtered result is sent as NDJSON instead.
+    Pages carry an ETag for the whole filtered collection, and a matching
+    If-None-Match is answered with 304 before any page is read.
+    """
+    listing = _ProjectListing(limit, cursor, owner_id, name_prefix, updated_since, if_none_match)
+    if stream:
+        return listing.stream(project_service)
+    not_modified = listing.not_modified(listing.version(project_service))
+    if not_modified:
+        return not_modified
+    return listing.respond(listing.page(project_service), response)
+
+# Declared before /projects/{project_id}, which would otherwise capture "count"
+@router.get("/projects/count", response_model=ProjectCount)
+def count_projects(
+    owner_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
     project_service: ProjectService = Depends()
-) -> List[ProjectResponse]:
+) -> ProjectCount:
     """
-    Get all projects (for all users)
+    Count projects, optionally of one owner
     """
-    return project_service.get_projects()
+    return project_service.count_projects(owner_id)
+
+# Declared before /projects/{project_id}, which would otherwise capture "search"
+@router.get("/projects/search", response_model=List[ProjectResponse])
+def search_projects(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    project_service: ProjectService = Depends()
+):
+    """
+    Search project names and descriptions, best match first.
+
+    Every word must match; the last one also matches as a prefix. The cursor
+    for the next page is returned in the X-Next-Cursor header.
+    """
+    page_size, offset = _search_window(limit, cursor)
+    projects = project_service.search_projects(q, page_size, offset)
+    return _search_page(projects, page_size, offset, response)
 
 @router.get("/projects/{project_id}", response_model=ProjectResponse)
 def get_project(
     project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     project_service: ProjectService = Depends()
-) -> ProjectResponse:
+):
     """
     Get a project by ID
     """
-    return project_service.get_project_by_id(project_id)
+    project = project_service.get_project_by_id(project_id)
+    return _project_response(project, response, if_none_match)
 
 @router.put("/projects/{project_id}", response_model=ProjectResponse)
 def update_project(
@@ -62,3 +250,128 @@ def delete_project(
     """
     project_service.delete_project(project_id, current_user)
 
+# Same routes served through AsyncProjectService when settings.DB_ASYNC is on
+async_router = APIRouter(route_class=ProfiledRoute)
+
+@async_router.post("/projects", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def create_project_async(
+    project_data: ProjectCreate,
+    current_user: User = Depends(get_admin_user_async),
+    project_service: AsyncProjectService = Depends()
+) -> ProjectResponse:
+    """
+    Create a new project (admin only)
+    """
+    return await project_service.create_project(project_data, current_user)
+
+@async_router.post("/projects:batch", response_model=ProjectBatchResponse)
+async def batch_projects_async(
+    batch: ProjectBatchRequest,
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+) -> ProjectBatchResponse:
+    """
+    Create, update and delete many projects in one transaction.
+
+    Each item gets its own status code: creates and deletes are admin only,
+    updates need admin or project ownership.
+    """
+    return await project_service.batch(batch, current_user)
+
+@async_router.get("/projects", response_model=List[ProjectResponse])
+async def get_projects_async(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    name_prefix: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+):
+    """
+    Get projects (for all users), one keyset page at a time.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    With stream=true the whole filtered result is sent as NDJSON instead.
+    Pages carry an ETag for the whole filtered collection, and a matching
+    If-None-Match is answered with 304 before any page is read.
+    """
+    listing = _ProjectListing(limit, cursor, owner_id, name_prefix, updated_since, if_none_match)
+    if stream:
+        return listing.stream(project_service)
+    not_modified = listing.not_modified(await listing.version(project_service))
+    if not_modified:
+        return not_modified
+    return listing.respond(await listing.page(project_service), response)
+
+# Declared before /projects/{project_id}, which would otherwise capture "count"
+@async_router.get("/projects/count", response_model=ProjectCount)
+async def count_projects_async(
+    owner_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+) -> ProjectCount:
+    """
+    Count projects, optionally of one owner
+    """
+    return await project_service.count_projects(owner_id)
+
+# Declared before /projects/{project_id}, which would otherwise capture "search"
+@async_router.get("/projects/search", response_model=List[ProjectResponse])
+async def search_projects_async(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+):
+    """
+    Search project names and descriptions, best match first.
+
+    Every word must match; the last one also matches as a prefix. The cursor
+    for the next page is returned in the X-Next-Cursor header.
+    """
+    page_size, offset = _search_window(limit, cursor)
+    projects = await project_service.search_projects(q, page_size, offset)
+    return _search_page(projects, page_size, offset, response)
+
+@async_router.get("/projects/{project_id}", response_model=ProjectResponse)
+async def get_project_async(
+    project_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+):
+    """
+    Get a project by ID
+    """
+    project = await project_service.get_project_by_id(project_id)
+    return _project_response(project, response, if_none_match)
+
+@async_router.put("/projects/{project_id}", response_model=ProjectResponse)
+async def update_project_async(
+    project_id: int,
+    project_data: ProjectUpdate,
+    current_user: User = Depends(get_current_active_user_async),
+    project_service: AsyncProjectService = Depends()
+) -> ProjectResponse:
+    """
+    Update a project (admin or project owner)
+    """
+    return await project_service.update_project(project_id, project_data, current_user)
+
+@async_router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project_async(
+    project_id: int,
+    current_user: User = Depends(get_admin_user_async),
+    project_service: AsyncProjectService = Depends()
+) -> None:
+    """
+    Delete a project (admin only)
+    """
+    await project_service.delete_project(project_id, current_user)
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, Query, Response
+from services.user import UserService, AsyncUserService
+from schemas.project import ProjectResponse, ProjectCount
+from core.dependencies import get_current_active_user, get_current_active_user_async
+from core.pagination import decode_cursor, page_response, page_size_for
+from core.tracing import ProfiledRoute
+from config.config import settings
+from models.user import User
+from typing import List, Optional
+
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/users/{user_id}/projects", response_model=List[ProjectResponse])
+def get_user_projects(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    user_service: UserService = Depends()
+):
+    """
+    Get one user's projects, one keyset page at a time.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    page_size = page_size_for(limit)
+    projects = user_service.get_user_projects(user_id, page_size, decode_cursor(cursor))
+    return page_response(projects, page_size, response)
+
+@router.get("/users/{user_id}/projects/count", response_model=ProjectCount)
+def count_user_projects(
+    user_id: int,
+    current_user: User = Depends(get_current_active_user),
+    user_service: UserService = Depends()
+) -> ProjectCount:
+    """
+    Count one user's projects
+    """
+    return user_service.count_user_projects(user_id)
+
+# Same routes served through AsyncUserService when settings.DB_ASYNC is on
+async_router = APIRouter(route_class=ProfiledRoute)
+
+@async_router.get("/users/{user_id}/projects", response_model=List[ProjectResponse])
+async def get_user_projects_async(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user_async),
+    user_service: AsyncUserService = Depends()
+):
+    """
+    Get one user's projects, one keyset page at a time.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    page_size = page_size_for(limit)
+    projects = await user_service.get_user_projects(user_id, page_size, decode_cursor(cursor))
+    return page_response(projects, page_size, response)
+
+@async_router.get("/users/{user_id}/projects/count", response_model=ProjectCount)
+async def count_user_projects_async(
+    user_id: int,
+    current_user: User = Depends(get_current_active_user_async),
+    user_service: AsyncUserService = Depends()
+) -> ProjectCount:
+    """
+    Count one user's projects
+    """
+    return await user_service.count_user_projects(user_id)
@@ -0,0 +1,118 @@
+"""
+Login throughput with and without the password hashing pool.
+
+Drives POST /api/v1/auth/login through an in-process ASGI client against a
+temporary SQLite database and reports logins per second per core, plus the
+latency of GET /health while the login burst is running.
+
+    python benchmarks/bench_login.py --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from sqlmodel import SQLModel, Session, create_engine
+
+from config.config import settings
+from core import security
+from core.db import get_session
+from core.jobs import job_queue
+from main import app
+
+async def run(requests: int, concurrency: int) -> dict:
+    # ASGITransport skips the lifespan; run the job queue as the app would
+    await job_queue.start()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        rejected = 0
+
+        async def login():
+            nonlocal rejected
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"username": "benchuser", "password": "benchpassword"},
+                )
+                if response.status_code == 503:
+                    rejected += 1
+
+        async def probe(latencies: list, done: asyncio.Event):
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        latencies: list = []
+        done = asyncio.Event()
+        prober = asyncio.create_task(probe(latencies, done))
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    await job_queue.stop()
+
+    cores = os.cpu_count() or 1
+    return {
+        "logins_per_sec": (requests - rejected) / elapsed,
+        "logins_per_sec_per_core": (requests - rejected) / elapsed / cores,
+        "rejected": rejected,
+        "health_p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "health_max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS, help="bcrypt cost factor")
+    args = parser.parse_args()
+
+    security.set_bcrypt_rounds(args.rounds)
+    # Measures hashing throughput, not the login rate limiter
+    settings.RATE_LIMIT_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+
+        def get_bench_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = get_bench_session
+        job_queue.bind = engine
+        asyncio.run(_register())
+
+        print(f"cores={os.cpu_count()} rounds={args.rounds} requests={args.requests} concurrency={args.concurrency}")
+        for use_pool in (False, True):
+            settings.PASSWORD_HASH_POOL = use_pool
+            result = asyncio.run(run(args.requests, args.concurrency))
+            label = "pool" if use_pool else "inline"
+            print(
+                f"{label:>6}: {result['logins_per_sec']:8.1f} logins/s "
+                f"({result['logins_per_sec_per_core']:.1f}/core), "
+                f"rejected={result['rejected']}, "
+                f"/health p50={result['health_p50_ms']:.1f}ms max={result['health_max_ms']:.1f}ms"
+            )
+
+async def _register():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post(
+            "/api/v1/auth/register",
+            json={"username": "benchuser", "password": "benchpassword", "role": "user"},
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Owner-scoped project queries on a plain vs. an owner-partitioned table.
+
+Loads the same projects into a plain project table and then into one
+hash-partitioned by owner_id (migration 0006_project_partitions), with one
+large tenant owning --tenant-share of the rows and the rest spread over
+--owners small ones. For each layout it times owner-scoped listing (first
+and a deep keyset page, through the service's queries), the per-owner count,
+and deleting every project of one owner, and reports how many partitions
+the listing plan touches. Deletes are rolled back so every run sees the same
+data. Postgres only; the database must be empty, or at least disposable.
+
+    python benchmarks/bench_partitions.py --database postgresql://localhost/bench --projects 2000000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Session, create_engine
+
+from core.migrations import partition_projects
+from models.project import Project
+from models.user import User
+from services.project import _count_query, _projects_query
+
+PAGE_SIZE = 100
+
+def make_rows(projects: int, owners: List[int], tenant_share: float, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    tenant, others = owners[0], owners[1:]
+    start = datetime(2024, 1, 1)
+    rows = []
+    for project_id in range(1, projects + 1):
+        owner_id = tenant if rng.random() < tenant_share else rng.choice(others)
+        created = start + timedelta(seconds=project_id)
+        rows.append({
+            "id": project_id, "name": f"project {project_id}", "description": None,
+            "owner_id": owner_id, "created_at": created, "updated_at": created,
+        })
+    return rows
+
+def timed(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def load(engine: Engine, owner_count: int, projects: int, tenant_share: float, partitions: int) -> List[int]:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        partition_projects(conn, partitions)
+    with Session(engine) as session:
+        owners = [User(username=f"bench-owner-{i}", hashed_password="x", role="user") for i in range(owner_count)]
+        session.add_all(owners)
+        session.commit()
+        owner_ids = [owner.id for owner in owners]
+        rows = make_rows(projects, owner_ids, tenant_share)
+        start = time.perf_counter()
+        for offset in range(0, len(rows), 10_000):
+            session.exec(insert(Project), params=rows[offset:offset + 10_000])
+        session.commit()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE project")
+    print(f"  loaded {projects} projects in {time.perf_counter() - start:.1f}s")
+    return owner_ids
+
+def partitions_scanned(engine: Engine, statement) -> int:
+    compiled = statement.compile(engine)
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN " + compiled.string, compiled.params).scalars().all()
+    return sum("on project" in line for line in plan)
+
+def bench_layout(engine: Engine, owner_ids: List[int], projects: int, repeat: int) -> Dict[str, float]:
+    tenant, small = owner_ids[0], owner_ids[len(owner_ids) // 2]
+    deep = projects * 3 // 4
+    queries = {
+        "tenant first page": _projects_query(None, tenant, None, None).limit(PAGE_SIZE),
+        "tenant deep page": _projects_query(deep, tenant, None, None).limit(PAGE_SIZE),
+        "small owner page": _projects_query(None, small, None, None).limit(PAGE_SIZE),
+        "tenant count": _count_query(tenant),
+    }
+    results = {}
+    with Session(engine) as session:
+        for name, statement in queries.items():
+            results[name] = timed(lambda: session.exec(statement).all(), repeat)
+    print(f"  owner listing plan touches {partitions_scanned(engine, queries['small owner page'])} table(s)")
+
+    def delete_owner():
+        with engine.connect() as conn:
+            transaction = conn.begin()
+            conn.execute(delete(Project).where(Project.owner_id == small))
+            transaction.rollback()
+
+    results["small owner delete"] = timed(delete_owner, repeat)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", required=True, help="Postgres URL of a disposable database")
+    parser.add_argument("--projects", type=int, default=2_000_000)
+    parser.add_argument("--owners", type=int, default=1000)
+    parser.add_argument("--tenant-share", type=float, default=0.5, help="fraction of projects owned by the large tenant")
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database)
+    layouts = {}
+    for name, partitions in (("plain", 0), (f"hash x{args.partitions}", args.partitions)):
+        print(f"{name}:")
+        owner_ids = load(engine, args.owners, args.projects, args.tenant_share, partitions)
+        layouts[name] = bench_layout(engine, owner_ids, args.projects, args.repeat)
+
+    names = list(layouts)
+    print(f"{'query':>20}" + "".join(f"{name + ' ms':>16}" for name in names))
+    for query in layouts[names[0]]:
+        print(f"{query:>20}" + "".join(f"{layouts[name][query] * 1000:>16.2f}" for name in names))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Project search at 1M projects.
+
+Times building the in-process search index (the non-Postgres backend of
+GET /projects/search) and answering rare-word, common-word, two-word and
+short-prefix queries, against the substring scan over every row that a
+client does with the full project list. Documents are generated in memory.
+
+With --database pointing at Postgres, the rows are also loaded into a
+scratch project table there and the same queries run through the GIN
+index; the database must be empty, or at least disposable.
+
+    python benchmarks/bench_search.py --projects 1000000
+    python benchmarks/bench_search.py --projects 1000000 --database postgresql://localhost/bench
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine
+
+from core.search import ProjectSearchIndex, search_terms
+from models.project import Project
+from models.user import User
+from services.project import _search_query
+
+QUERIES = ("zephyr", "service", "payments api", "da")
+_WORDS = (
+    "api billing dashboard data engine gateway internal ledger mobile payments "
+    "pipeline platform portal reports search service storage sync tools web"
+).split()
+
+def make_documents(count: int, seed: int = 0) -> List[Tuple[int, str, Optional[str]]]:
+    rng = random.Random(seed)
+    documents = []
+    for project_id in range(1, count + 1):
+        name = f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {project_id}"
+        description = " ".join(rng.choices(_WORDS, k=8)) if project_id % 4 else None
+        if project_id % 100_000 == 0:
+            name += " zephyr"  # a rare word
+        documents.append((project_id, name, description))
+    return documents
+
+def timed(fn: Callable, repeat: int = 5) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def substring_scan(documents, query: str, limit: int) -> List[int]:
+    words = query.lower().split()
+    matches = []
+    for project_id, name, description in documents:
+        text = f"{name} {description or ''}".lower()
+        if all(word in text for word in words):
+            matches.append(project_id)
+            if len(matches) == limit:
+                break
+    return matches
+
+def bench_memory(documents, limit: int, repeat: int) -> None:
+    index = ProjectSearchIndex()
+    start = time.perf_counter()
+    index.begin_load()
+    index.finish_load(documents)
+    print(f"in-process index: {len(documents)} projects, {index.stats()['terms']} terms, "
+          f"built in {time.perf_counter() - start:.1f}s")
+    print(f"{'query':>16}{'index ms':>10}{'scan ms':>10}")
+    for query in QUERIES:
+        indexed, _ = timed(lambda: index.search(search_terms(query), limit), repeat)
+        scanned, _ = timed(lambda: substring_scan(documents, query, limit), 1)
+        print(f"{query:>16}{indexed * 1000:>10.2f}{scanned * 1000:>10.1f}")
+
+def bench_postgres(url: str, documents, limit: int, repeat: int) -> None:
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+    with Session(engine) as session:
+        owner = User(username="bench-search", hashed_password="x", role="admin")
+        session.add(owner)
+        session.commit()
+        rows = [
+            {"id": project_id, "name": name, "description": description,
+             "owner_id": owner.id, "created_at": now, "updated_at": now}
+            for project_id, name, description in documents
+        ]
+        start = time.perf_counter()
+        for offset in range(0, len(rows), 10_000):
+            session.exec(insert(Project), params=rows[offset:offset + 10_000])
+        session.commit()
+    print(f"postgres: loaded {len(documents)} projects in {time.perf_counter() - start:.1f}s")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE project")
+    print(f"{'query':>16}{'gin ms':>10}")
+    with Session(engine) as session:
+        for query in QUERIES:
+            elapsed, _ = timed(lambda: session.exec(_search_query(search_terms(query), limit, 0)).all(), repeat)
+            print(f"{query:>16}{elapsed * 1000:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", help="Postgres URL to benchmark the GIN index as well")
+    args = parser.parse_args()
+
+    documents = make_documents(args.projects)
+    bench_memory(documents, args.limit, args.repeat)
+    if args.database:
+        bench_postgres(args.database, documents, args.limit, args.repeat)
+
+if __name__ == "__main__":
+    main()
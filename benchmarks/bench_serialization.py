@@ -0,0 +1,75 @@
+"""
+Per-row serialization cost of the project list at 1k, 10k and 100k rows.
+
+Compares the default path (a ProjectResponse per row, response_model
+re-validation, stdlib json) with the FAST_JSON path (column rows as dicts
+encoded by orjson in one call). Rows are generated in memory so the
+numbers exclude database time.
+
+    python benchmarks/bench_serialization.py --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import orjson
+from pydantic import TypeAdapter
+
+from schemas.project import ProjectResponse
+
+_response_model = TypeAdapter(List[ProjectResponse])
+
+def make_rows(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "name": f"Project {i}",
+            "description": "A project description of typical length" if i % 3 else None,
+            "owner_id": i % 50 + 1,
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i, microseconds=i),
+        }
+        for i in range(1, count + 1)
+    ]
+
+def default_path(rows: List[dict]) -> bytes:
+    # What ProjectService.get_projects plus FastAPI's response_model handling do
+    projects = [ProjectResponse(**row) for row in rows]
+    validated = _response_model.validate_python(projects)
+    content = _response_model.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def fast_path(rows: List[dict]) -> bytes:
+    return orjson.dumps(rows)
+
+def measure(fn: Callable[[List[dict]], bytes], rows: List[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'default us/row':>16}{'fast us/row':>14}{'speedup':>9}")
+    for size in args.sizes:
+        rows = make_rows(size)
+        assert json.loads(default_path(rows)) == json.loads(fast_path(rows))
+        default = measure(default_path, rows, args.repeat)
+        fast = measure(fast_path, rows, args.repeat)
+        print(f"{size:>8}{default / size * 1e6:>16.2f}{fast / size * 1e6:>14.2f}{default / fast:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Pick the bcrypt cost factor for a target hashing latency on this machine.
+
+Times bcrypt at increasing rounds (each round doubles the work) and
+recommends the highest BCRYPT_ROUNDS whose median hash time stays within
+the target. Logins per second per core is roughly 1000 / median ms, so the
+target trades brute-force resistance against login throughput.
+
+    python benchmarks/calibrate_hash_cost.py --target-ms 250
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+def time_bcrypt(rounds: int, samples: int) -> float:
+    """Median milliseconds for one bcrypt hash at rounds."""
+    from passlib.hash import bcrypt
+
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate(target_ms: float, samples: int, min_rounds: int, max_rounds: int) -> Tuple[Optional[int], Dict[int, float]]:
+    """Return the recommended rounds (None if even min_rounds is too slow) and the timings measured."""
+    timings: Dict[int, float] = {}
+    recommended = None
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = time_bcrypt(rounds, samples)
+        if timings[rounds] > target_ms:
+            break
+        recommended = rounds
+    return recommended, timings
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="acceptable time for one hash")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per cost factor")
+    parser.add_argument("--min-rounds", type=int, default=4)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    recommended, timings = calibrate(args.target_ms, args.samples, args.min_rounds, args.max_rounds)
+    print(f"{'rounds':>6}{'median ms':>12}{'logins/s/core':>16}")
+    for rounds, median_ms in timings.items():
+        print(f"{rounds:>6}{median_ms:>12.1f}{1000 / median_ms:>16.1f}")
+    if recommended is None:
+        print(f"even {args.min_rounds} rounds take longer than {args.target_ms:.0f} ms")
+        return 1
+    print(f"BCRYPT_ROUNDS={recommended}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
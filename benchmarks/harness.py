@@ -0,0 +1,295 @@
+"""
+Load-testing harness for the API, run in-process without network access.
+
+Seeds users and projects into a temporary SQLite database (or --database),
+drives a weighted mix of register / login / list / get / update / delete
+requests through an ASGI client at the given concurrency, and reports
+requests per second, p50/p95/p99 latency and SQL queries per request for
+every operation.
+
+    python benchmarks/harness.py --requests 2000 --concurrency 32
+    python benchmarks/harness.py --write-baseline benchmarks/baseline.json
+    python benchmarks/harness.py --baseline benchmarks/baseline.json --threshold 0.25
+
+With --baseline the run exits non-zero when an operation's p95 latency
+or queries per request regress past the threshold.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event, insert
+from sqlmodel import SQLModel, Session, create_engine
+
+from config.config import settings
+from core import security
+from core.db import get_session
+from core.jobs import job_queue
+from main import app
+from models.project import Project
+from models.user import User
+
+OPERATIONS = ("register", "login", "list", "get", "update", "delete")
+DEFAULT_MIX = "register=1,login=2,list=20,get=50,update=10,delete=2"
+PASSWORD = "benchpassword"
+
+# Operation being driven by the current task; the app inherits it through
+# the ASGI transport and the threadpool, which attributes queries to it.
+_current_operation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "benchmark_operation", default=None
+)
+
+@dataclass
+class OperationStats:
+    latencies: List[float] = field(default_factory=list)
+    queries: int = 0
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "rps": count / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p95_ms": _percentile(latencies, 95) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000,
+            "queries_per_request": self.queries / count if count else 0.0,
+            "errors": self.errors,
+        }
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name] = int(weight)
+    return weights
+
+def seed(engine, users: int, projects: int) -> None:
+    """Insert users (one admin first) and projects with bulk INSERTs."""
+    hashed_password = security.pwd_context.hash(PASSWORD)
+    with Session(engine) as session:
+        session.exec(insert(User), params=[
+            {
+                "username": f"seed{i}",
+                "email": None,
+                "full_name": None,
+                "role": "admin" if i == 0 else "user",
+                "is_active": True,
+                "hashed_password": hashed_password,
+            }
+            for i in range(users)
+        ])
+        session.exec(insert(Project), params=[
+            {"name": f"Seed project {i}", "description": "Seeded", "owner_id": 1}
+            for i in range(projects)
+        ])
+        session.commit()
+
+class Driver:
+    def __init__(self, client: httpx.AsyncClient, users: int, projects: int, rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.project_ids = list(range(1, projects + 1))
+        self.registered = 0
+        self.admin_headers: Dict[str, str] = {}
+        self.user_headers: Dict[str, str] = {}
+
+    async def login_headers(self, username: str) -> Dict[str, str]:
+        response = await self.client.post(
+            "/api/v1/auth/login", json={"username": username, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def setup(self) -> None:
+        self.admin_headers = await self.login_headers("seed0")
+        self.user_headers = await self.login_headers(f"seed{min(1, self.users - 1)}")
+
+    async def run(self, operation: str) -> httpx.Response:
+        if operation == "register":
+            self.registered += 1
+            return await self.client.post(
+                "/api/v1/auth/register",
+                json={"username": f"bench{self.registered}", "password": PASSWORD, "role": "user"},
+            )
+        if operation == "login":
+            return await self.client.post(
+                "/api/v1/auth/login",
+                json={"username": f"seed{self.rng.randrange(self.users)}", "password": PASSWORD},
+            )
+        if operation == "list":
+            return await self.client.get(
+                "/api/v1/project/projects", params={"limit": 50}, headers=self.user_headers
+            )
+        if operation == "get":
+            project_id = self.rng.choice(self.project_ids)
+            return await self.client.get(f"/api/v1/project/projects/{project_id}", headers=self.user_headers)
+        if operation == "update":
+            project_id = self.rng.choice(self.project_ids)
+            return await self.client.put(
+                f"/api/v1/project/projects/{project_id}",
+                json={"description": f"Updated {time.time()}"},
+                headers=self.admin_headers,
+            )
+        if operation == "delete":
+            # Delete from the tail so get/update keep hitting live rows
+            project_id = self.project_ids.pop() if len(self.project_ids) > 1 else 0
+            return await self.client.delete(f"/api/v1/project/projects/{project_id}", headers=self.admin_headers)
+        raise ValueError(operation)
+
+async def drive(engine, args) -> Dict[str, Dict[str, float]]:
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(weights), weights=list(weights.values()), k=args.requests)
+    stats = {operation: OperationStats() for operation in weights}
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        operation = _current_operation.get()
+        if operation is not None:
+            stats[operation].queries += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    # ASGITransport skips the lifespan; run the job queue as the app would
+    await job_queue.start(engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        driver = Driver(client, args.users, args.projects, rng)
+        await driver.setup()
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(operation: str) -> None:
+            async with semaphore:
+                _current_operation.set(operation)
+                start = time.perf_counter()
+                response = await driver.run(operation)
+                stats[operation].latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500 or (
+                    response.status_code >= 400 and operation not in ("delete",)
+                ):
+                    stats[operation].errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.create_task(one(operation)) for operation in plan))
+        elapsed = time.perf_counter() - start
+    await job_queue.stop()
+    job_queue.bind = None
+    event.remove(engine, "before_cursor_execute", count_query)
+
+    report = {operation: stats[operation].summary(elapsed) for operation in weights}
+    report["total"] = {"requests": len(plan), "rps": len(plan) / elapsed, "elapsed_s": elapsed}
+    return report
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Regressions of report against baseline, as human-readable lines."""
+    regressions = []
+    for operation, current in report.items():
+        previous = baseline.get(operation)
+        if operation == "total" or not previous or not current.get("requests"):
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{operation}: p95 {current['p95_ms']:.1f}ms vs baseline {previous['p95_ms']:.1f}ms"
+            )
+        if current["queries_per_request"] > previous["queries_per_request"] + 1e-9:
+            regressions.append(
+                f"{operation}: {current['queries_per_request']:.2f} queries/request "
+                f"vs baseline {previous['queries_per_request']:.2f}"
+            )
+    return regressions
+
+def print_report(report: Dict) -> None:
+    print(f"{'operation':<10}{'requests':>10}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>8}{'errors':>8}")
+    for operation, row in report.items():
+        if operation == "total":
+            continue
+        print(
+            f"{operation:<10}{row['requests']:>10}{row['rps']:>10.1f}{row['p50_ms']:>10.2f}"
+            f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['queries_per_request']:>8.2f}{row['errors']:>8}"
+        )
+    total = report["total"]
+    print(f"total: {total['requests']} requests in {total['elapsed_s']:.2f}s = {total['rps']:.1f} rps")
+
+def run(args) -> Dict:
+    security.set_bcrypt_rounds(args.rounds)
+    # Every simulated client logs in from the same address
+    rate_limit_enabled = settings.RATE_LIMIT_ENABLED
+    settings.RATE_LIMIT_ENABLED = False
+    try:
+        return _run_seeded(args)
+    finally:
+        security.set_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+        settings.RATE_LIMIT_ENABLED = rate_limit_enabled
+
+def _run_seeded(args) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database or f"sqlite:///{directory}/benchmark.db"
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        engine = create_engine(url, connect_args=connect_args)
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.users, args.projects)
+
+        def get_benchmark_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = get_benchmark_session
+        try:
+            return asyncio.run(drive(engine, args))
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+            engine.dispose()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default: {DEFAULT_MIX})")
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost factor for the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", help="database URL; default is a temporary SQLite file")
+    parser.add_argument("--write-baseline", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 regression (0.25 = 25%%)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run(args)
+    print_report(report)
+
+    if args.write_baseline:
+        args.write_baseline.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from datetime import timedelta
+from typing import Any, Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -7,10 +8,175 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    # Login also returns a refresh token: exchanging it for a new access
+    # token is an HMAC check and a JWT sign, no bcrypt, so access tokens can
+    # be short-lived. Each refresh token is single use and rotated.
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Stateless mode resolves the current user from token claims and an
+    # in-process user state cache instead of a per-request user lookup.
+    AUTH_STATELESS: bool = False
+    USER_STATE_CACHE_TTL: int = 60  # seconds; bounds how stale a role or active flag can be
+    USER_STATE_CACHE_SIZE: int = 10000
+    # Decoded payloads of verified tokens, kept until the token expires
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Login / register throttling, checked before any lookup or hashing:
+    # token buckets of BURST requests refilled at PER_MINUTE, per client IP
+    # and per username. "redis" shares the limits between workers. A
+    # PER_MINUTE of 0 turns that limit off.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # buckets kept by the memory backend
+    AUTH_RATE_LIMIT_IP_BURST: int = 20
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: int = 10
+    AUTH_RATE_LIMIT_USERNAME_BURST: int = 5
+    AUTH_RATE_LIMIT_USERNAME_PER_MINUTE: int = 5
+
+    # Password hashing policy. New hashes use the first scheme; hashes in a
+    # later scheme, or bcrypt hashes below BCRYPT_ROUNDS, are rehashed in the
+    # background after the next successful login. Calibrate the cost with
+    # benchmarks/calibrate_hash_cost.py.
+    PASSWORD_SCHEMES: List[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    # Further passlib CryptContext settings, e.g. {"argon2__memory_cost": 65536}
+    PASSWORD_HASH_OPTIONS: Dict[str, Any] = {}
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+    # bcrypt releases the GIL, so hashing runs on a dedicated thread pool.
+    # Requests beyond workers + queue size are rejected with 503.
+    PASSWORD_HASH_POOL: bool = True
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # Database
+    # Async mode serves requests from an async engine (asyncpg / aiosqlite);
+    # the URL is derived from DATABASE_URL unless ASYNC_DATABASE_URL is set.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before giving up
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables the server-side timeout
+    # Behind PgBouncer in transaction mode: no local pool, no prepared statements
+    DB_EXTERNAL_POOLER: bool = False
+    # Hash-partition the project table by owner_id into this many partitions
+    # (Postgres only) with migration 0006_project_partitions, which stays
+    # pending while this is 0.
+    PROJECT_PARTITIONS: int = 0
+    # Read replicas (core/replicas.py). Read-only service methods run on a
+    # healthy replica picked round robin; for DB_READ_YOUR_WRITES_SECONDS
+    # after a user's own write their reads stay on the primary. Async URLs
+    # are derived from DATABASE_REPLICA_URLS unless set.
+    DATABASE_REPLICA_URLS: List[str] = []
+    ASYNC_DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    DB_REPLICA_MAX_LAG_SECONDS: float = 0  # Postgres only; 0 skips the lag check
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+    # "memory" is per worker, so serve.py requires "redis" with several workers
+    READ_YOUR_WRITES_BACKEND: str = "memory"
+
+    # Encode responses with orjson, and let list endpoints send selected
+    # columns straight to the encoder instead of building models per row
+    FAST_JSON: bool = False
+
+    # Response compression (core/compression.py): Brotli when the client
+    # accepts it and the brotli package is installed, otherwise gzip
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller bodies are not worth the CPU
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI: bool = True
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher levels cost far more CPU per byte saved
+
+    # Production server (serve.py). Tables are created once by the launcher,
+    # which then turns DB_CREATE_TABLES off for the workers it spawns.
+    DB_CREATE_TABLES: bool = True
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = int(os.getenv("PORT", "8080"))  # Cloud Run injects PORT
+    SERVER_WORKERS: int = os.cpu_count() or 1
+    SERVER_KEEPALIVE: int = 5  # seconds; keep above the load balancer's idle timeout if it reuses connections
+    SERVER_BACKLOG: int = 2048
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None  # per worker; excess connections get 503
+    SERVER_LOOP: str = "auto"  # "auto" uses uvloop when installed
+    SERVER_HTTP: str = "auto"  # "auto" uses httptools when installed
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # seconds to finish in-flight requests on shutdown
+    # Peers whose X-Forwarded-For / X-Forwarded-Proto uvicorn believes, comma
+    # separated. Only list the load balancer: the client IP feeds the auth rate
+    # limiter, and an untrusted peer could otherwise pick a new one per request.
+    # CIDR ranges are accepted; the Docker image sets Cloud Run's front ends.
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Background jobs (core/jobs.py) for writes that should not hold up a
+    # response, such as last-login times and password rehashes. Durable mode
+    # stores jobs in the background_job table until they are done.
+    JOB_QUEUE_WORKERS: int = 2
+    JOB_BATCH_SIZE: int = 100  # jobs handled per transaction
+    JOB_BATCH_WAIT_MS: int = 10  # wait for more jobs before running a lone one
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 0.5  # seconds, doubled per attempt
+    JOB_DRAIN_TIMEOUT: float = 10  # seconds to finish queued jobs on shutdown
+    JOB_QUEUE_DURABLE: bool = False
+
+    # Request tracing: per-request spans exported at /metrics and in a
+    # Server-Timing header. Every PROFILE_EVERY_N_REQUESTS-th request is
+    # profiled with pyinstrument into PROFILE_DIR (0 disables profiling).
+    TRACING_ENABLED: bool = True
+    SERVER_TIMING_HEADER: bool = True
+    PROFILE_EVERY_N_REQUESTS: int = 0
+    PROFILE_DIR: str = "profiles"
+
+    # Project listing
+    PROJECTS_PAGE_SIZE: int = 100
+    PROJECTS_MAX_PAGE_SIZE: int = 1000
+    PROJECTS_STREAM_BATCH_SIZE: int = 1000  # rows fetched per server-side cursor round trip
+    PROJECT_BATCH_MAX_SIZE: int = 10000  # create + update + delete items per batch request
+    # /projects/search: a GIN-indexed tsvector on Postgres, an in-process
+    # inverted index (core/search.py) elsewhere. The last word of a query
+    # matches as a prefix once it has this many characters.
+    PROJECT_SEARCH_MIN_PREFIX: int = 2
+    # Serve unfiltered GET /projects pages from an in-process snapshot of the
+    # table (core/snapshot.py), refreshed from updated_at at most this often
+    PROJECT_SNAPSHOT_ENABLED: bool = False
+    PROJECT_SNAPSHOT_REFRESH_SECONDS: float = 1.0
+    PROJECT_SNAPSHOT_LOOKBACK_SECONDS: float = 5.0  # re-read for out-of-order commits
+    PROJECT_SNAPSHOT_PAGE_CACHE_SIZE: int = 1024  # serialized pages kept
+    # Read-through cache for single projects: "none", "memory" or "redis".
+    # "memory" is per worker and only sees that worker's writes, so with
+    # several workers a project can be PROJECT_CACHE_TTL stale elsewhere;
+    # use "redis" there, or keep the TTL short.
+    PROJECT_CACHE_BACKEND: str = "none"
+    PROJECT_CACHE_TTL: int = 300  # seconds
+    PROJECT_CACHE_SIZE: int = 10000  # entries, memory backend only
+    REDIS_URL: str = "redis://localhost:6379/0"
 
     class Config:
         env_file = ".env"
 
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return _async_url(self.DATABASE_URL)
+
+    @property
+    def async_replica_urls(self) -> List[str]:
+        if self.ASYNC_DATABASE_REPLICA_URLS:
+            return self.ASYNC_DATABASE_REPLICA_URLS
+        return [_async_url(url) for url in self.DATABASE_REPLICA_URLS]
+
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
 settings = Settings()
 
 # print(settings.model_dump())
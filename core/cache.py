@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from config.config import settings
+import threading
+import time
+
+class LRUCache:
+    """Thread-safe in-process LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value; ttl overrides the cache-wide TTL for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class CacheBackend(ABC):
+    """Byte-string cache interface shared by the in-process and Redis backends."""
+
+    # True when calls do network I/O and should be kept off the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: Optional[int] = None):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+class RedisCacheBackend(CacheBackend):
+    """Backend for any client with Redis' get / set(ex=) / delete commands."""
+
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = "", ttl: Optional[int] = None):
+        self._client = client
+        self._prefix = prefix
+        self._ttl = ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self._client.set(self._prefix + key, value, ex=ttl if ttl is not None else self._ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+def build_cache_backend(kind: str, maxsize: int, ttl: Optional[int]) -> Optional[CacheBackend]:
+    """Create the backend named by a *_CACHE_BACKEND setting, or None for "none"."""
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+    if kind == "redis":
+        # Optional dependency, only needed when a Redis backend is configured
+        import redis
+
+        return RedisCacheBackend(redis.Redis.from_url(settings.REDIS_URL), ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -0,0 +1,72 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli is preferred when the client accepts it and the optional `brotli`
+package is installed, gzip otherwise. Bodies below COMPRESSION_MINIMUM_SIZE
+bytes are sent as they are. Compressed responses carry a weak ETag, since a
+strong one promises byte-identical bodies across encodings; If-None-Match
+handling compares ETags weakly, so 304s are unaffected.
+"""
+from importlib.util import find_spec
+from typing import Set
+from starlette.datastructures import Headers, MutableHeaders
+# Starlette internals, pinned in requirements.txt
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.config import settings
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self._compressor.process(body)
+        # Flush per chunk so streamed NDJSON lines reach the client promptly
+        return compressed + (self._compressor.flush() if more_body else self._compressor.finish())
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.brotli = settings.COMPRESSION_BROTLI and find_spec("brotli") is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+        if self.brotli and "br" in accepted:
+            responder = BrotliResponder(self.app, settings.COMPRESSION_MINIMUM_SIZE, settings.COMPRESSION_BROTLI_QUALITY)
+        elif "gzip" in accepted:
+            responder = GZipResponder(
+                self.app, settings.COMPRESSION_MINIMUM_SIZE, compresslevel=settings.COMPRESSION_GZIP_LEVEL
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_weak_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("ETag")
+                if etag and "content-encoding" in headers and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+            await send(message)
+
+        await responder(scope, receive, send_weak_etag)
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Codings named in an Accept-Encoding header, minus those refused with q=0."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        quality = params.strip().lower()
+        if coding and quality.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding)
+    return accepted
@@ -1,13 +1,105 @@
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
 from config.config import settings
+from core.tracing import record_span
+from typing import Any, Dict, Optional
 import os
+import time
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Build create_engine keyword arguments for url from the DB_* settings."""
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    backend = make_url(url).get_backend_name()
+    if backend != "postgresql":
+        # SQLite picks its own pool class and does not accept the sizing arguments
+        return options
+
+    driver = make_url(url).get_driver_name()
+    connect_args: Dict[str, Any] = {}
+    if settings.DB_EXTERNAL_POOLER:
+        # PgBouncer in transaction mode hands each transaction to a different
+        # server connection, so neither pooled connections nor prepared
+        # statements can be kept on our side. Startup options are not
+        # forwarded either; set statement_timeout on the role instead.
+        options["poolclass"] = NullPool
+        if driver == "asyncpg":
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            if driver == "asyncpg":
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+                }
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
 
 # Create engine
-engine = create_engine(url=settings.DATABASE_URL, echo=True)
+engine = create_engine(url=settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# The async engine is only built when something asks for it, so the sync
+# deployment does not need an async driver installed.
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            url=settings.async_database_url, **engine_options(settings.async_database_url)
+        )
+    return _async_engine
+
+def pool_status(bind: Engine) -> Dict[str, Any]:
+    """Snapshot of a connection pool's occupancy for the metrics endpoint."""
+    pool = bind.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    # NullPool and StaticPool keep no counters
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if counter is not None:
+            status[name] = counter()
+    return status
+
+# Every engine, including the async engines' sync cores, reports query time
+# to the request trace as the "db" span.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    record_span("db", time.perf_counter() - conn.info["query_start"].pop())
+
+@event.listens_for(Engine, "handle_error")
+def _stop_failed_query_timer(context):
+    # after_cursor_execute does not run for a statement that raised; drop its
+    # start so the pooled connection does not carry it into later queries
+    conn = context.connection
+    if conn is not None and context.statement is not None and conn.info.get("query_start"):
+        record_span("db", time.perf_counter() - conn.info["query_start"].pop())
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
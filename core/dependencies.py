@@ -1,10 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from jose import JWTError
 from models.user import User
-from core.db import get_session
+from core.db import get_session, get_async_session
+from core import replicas as replica_routing
 from core.security import verify_token
+from core.user_state import UserState, user_state_cache
+from config.config import settings
+from typing import AsyncIterator, Iterator
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
 
@@ -23,12 +28,18 @@ def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
+        if settings.AUTH_STATELESS:
+            state = user_state_cache.resolve(payload)
+            if state is not None:
+                return state.to_user()
         user = session.exec(select(User).where(User.id == user_id)).first()
         if user is None:
             raise credentials_exception
-    except JWTError:
+    except (JWTError, ValueError):
         raise credentials_exception
     
+    if settings.AUTH_STATELESS:
+        user_state_cache.set(UserState.from_user(user))
     return user
 
 def get_current_active_user(
@@ -47,3 +58,71 @@ def get_admin_user(
             detail="User does not enough permissions",
         )
     return current_user
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    try:
+        payload = verify_token(token)
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            raise credentials_exception
+        if settings.AUTH_STATELESS:
+            state = user_state_cache.resolve(payload)
+            if state is not None:
+                return state.to_user()
+        # asyncpg does not coerce the string claim to the integer column type
+        result = await session.exec(select(User).where(User.id == int(user_id)))
+        user = result.first()
+        if user is None:
+            raise credentials_exception
+    except (JWTError, ValueError):
+        raise credentials_exception
+
+    if settings.AUTH_STATELESS:
+        user_state_cache.set(UserState.from_user(user))
+    return user
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    return get_current_active_user(current_user)
+
+async def get_admin_user_async(
+    current_user: User = Depends(get_current_active_user_async),
+) -> User:
+    return get_admin_user(current_user)
+
+def get_read_session(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Iterator[Session]:
+    """
+    Session for read-only service methods: a replica when one is configured
+    and healthy and the user has not written recently, else the primary
+    session (which is also what test overrides of get_session provide).
+    """
+    replica = replica_routing.replica_for(current_user.id)
+    if replica is None:
+        yield session
+        return
+    with Session(replica_routing.replicas.engines[replica]) as read_session:
+        yield read_session
+
+async def get_read_session_async(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async),
+) -> AsyncIterator[AsyncSession]:
+    replica = await replica_routing.replica_for_async(current_user.id)
+    if replica is None:
+        yield session
+        return
+    async with AsyncSession(replica_routing.replicas.async_engine(replica), expire_on_commit=False) as read_session:
+        yield read_session
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+def make_etag(*parts: object) -> str:
+    """Strong entity tag built from values that change whenever the resource does."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp for Last-Modified; naive values are local time, as datetime.now() writes them."""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
@@ -0,0 +1,203 @@
+"""
+In-process background jobs for writes that should not hold up a response.
+
+Services defer a job with job_queue.defer(kind, payload). Worker tasks on
+the event loop pick jobs up in batches, run the handler registered for
+their kind in a thread with a fresh Session, and retry failed batches with
+exponential backoff. The lifespan hook starts the queue and drains it on
+shutdown.
+
+With JOB_QUEUE_DURABLE on, deferred jobs are first stored in the
+background_job table of the application database and deleted in the same
+transaction as their handler's writes; jobs left over by a previous process
+are loaded again on start. Delivery is at least once, so handlers must be
+idempotent.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from typing import Any, Callable, Dict, List, Optional
+from config.config import settings
+from models.background_job import BackgroundJob
+import asyncio
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Session, List[Dict[str, Any]]], None]
+
+@dataclass
+class Job:
+    kind: str
+    payload: Dict[str, Any]
+    id: Optional[int] = None  # background_job row of a durable job
+
+class JobQueue:
+    def __init__(self, bind: Optional[Engine] = None):
+        # Engine the handlers write through; core.db.engine unless set
+        self.bind = bind
+        self._handlers: Dict[str, Handler] = {}
+        self._batch_sizes: Dict[str, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self._counters = {"deferred": 0, "processed": 0, "retried": 0, "failed": 0, "batches": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def register(self, kind: str, handler: Handler, batch_size: Optional[int] = None) -> None:
+        """
+        Handle jobs of kind with handler(session, payloads); the queue commits
+        afterwards. batch_size caps the payloads per call (and transaction)
+        below JOB_BATCH_SIZE, for handlers that are slow per payload.
+        """
+        self._handlers[kind] = handler
+        if batch_size is not None:
+            self._batch_sizes[kind] = batch_size
+
+    def defer(self, kind: str, payload: Dict[str, Any], durable: bool = True) -> None:
+        """
+        Run a job after the current request, from any thread.
+
+        durable=False keeps the job out of the durable store, for payloads
+        that must never be written down (such as a password to rehash).
+        When the queue is not running (scripts, tests), the job runs inline.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(kind=kind, payload=payload)
+        self._count("deferred")
+        if not self.running:
+            self._execute(job.kind, [job])
+            return
+        if durable and settings.JOB_QUEUE_DURABLE:
+            job.id = self._store(job)
+        self._put(job)
+
+    async def defer_async(self, kind: str, payload: Dict[str, Any], durable: bool = True) -> None:
+        """defer for coroutines: the durable insert, or an inline run, happens off the event loop."""
+        if (durable and settings.JOB_QUEUE_DURABLE) or not self.running:
+            await asyncio.to_thread(self.defer, kind, payload, durable)
+        else:
+            self.defer(kind, payload, durable)
+
+    async def start(self, bind: Optional[Engine] = None) -> None:
+        if bind is not None:
+            self.bind = bind
+        self._queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        if settings.JOB_QUEUE_DURABLE:
+            for job in await asyncio.to_thread(self._load_stored):
+                self._queue.put_nowait(job)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(settings.JOB_QUEUE_WORKERS)]
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Finish queued jobs (for at most timeout seconds), then stop the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            # Durable jobs are still stored and run after the next start
+            logger.warning("Stopping with %d background jobs left", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def _put(self, job: Job) -> None:
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._queue.put_nowait(job)
+        else:
+            # Sync endpoints run in the threadpool
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+
+    async def _work(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if settings.JOB_BATCH_WAIT_MS and self._queue.empty():
+                # Let a burst of requests coalesce into one transaction
+                await asyncio.sleep(settings.JOB_BATCH_WAIT_MS / 1000)
+            while len(batch) < settings.JOB_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                by_kind: Dict[str, List[Job]] = {}
+                for job in batch:
+                    by_kind.setdefault(job.kind, []).append(job)
+                for kind, jobs in by_kind.items():
+                    size = self._batch_sizes.get(kind, len(jobs))
+                    for start in range(0, len(jobs), size):
+                        await self._run(kind, jobs[start:start + size])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run(self, kind: str, jobs: List[Job]) -> None:
+        for attempt in range(settings.JOB_MAX_ATTEMPTS):
+            try:
+                await asyncio.to_thread(self._execute, kind, jobs)
+                return
+            except Exception:
+                logger.exception("Background %s batch failed (attempt %d)", kind, attempt + 1)
+                if attempt + 1 < settings.JOB_MAX_ATTEMPTS:
+                    self._count("retried", len(jobs))
+                    await asyncio.sleep(settings.JOB_RETRY_BACKOFF * 2 ** attempt)
+        # Durable jobs stay stored and are tried again after a restart
+        self._count("failed", len(jobs))
+
+    def _execute(self, kind: str, jobs: List[Job]) -> None:
+        with Session(self._bind()) as session:
+            self._handlers[kind](session, [job.payload for job in jobs])
+            stored = [job.id for job in jobs if job.id is not None]
+            if stored:
+                # Done exactly when the handler's writes commit
+                session.exec(delete(BackgroundJob).where(BackgroundJob.id.in_(stored)))
+            session.commit()
+        self._count("batches")
+        self._count("processed", len(jobs))
+
+    def _store(self, job: Job) -> int:
+        with Session(self._bind()) as session:
+            statement = insert(BackgroundJob).values(
+                kind=job.kind, payload=json.dumps(job.payload), created_at=datetime.now()
+            ).returning(BackgroundJob.id)
+            job_id = session.exec(statement).scalar_one()
+            session.commit()
+        return job_id
+
+    def _load_stored(self) -> List[Job]:
+        with Session(self._bind()) as session:
+            rows = session.exec(select(BackgroundJob).order_by(BackgroundJob.id)).all()
+        return [Job(kind=row.kind, payload=json.loads(row.payload), id=row.id) for row in rows]
+
+    def _bind(self) -> Engine:
+        if self.bind is None:
+            from core.db import engine
+
+            return engine
+        return self.bind
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+job_queue = JobQueue()
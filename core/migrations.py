@@ -0,0 +1,141 @@
+"""
+Versioned schema migrations, applied by an explicit command instead of the
+request lifespan:
+
+    python -m core.migrations
+
+Each migration runs once, in order, in its own transaction, and is recorded
+in the schema_migrations table. Migrations must be idempotent because a
+database created by create_db_and_tables already has the current schema.
+A migration that depends on a setting returns False while that setting
+leaves it nothing to do; it is then not recorded and runs again next time.
+"""
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+import models  # noqa: F401  registers the tables on SQLModel.metadata
+
+# Kept out of SQLModel.metadata so create_all never touches it
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def _initial_schema(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn)
+
+def _project_indexes(conn: Connection) -> None:
+    from models.project import Project
+
+    for index in Project.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+def _refresh_tokens(conn: Connection) -> None:
+    from models.refresh_token import RefreshToken
+
+    RefreshToken.__table__.create(conn, checkfirst=True)
+
+def _background_jobs(conn: Connection) -> None:
+    from models.background_job import BackgroundJob
+
+    if "last_login_at" not in {column["name"] for column in inspect(conn).get_columns("user")}:
+        conn.execute(text('ALTER TABLE "user" ADD COLUMN last_login_at TIMESTAMP'))
+    BackgroundJob.__table__.create(conn, checkfirst=True)
+
+def _project_search(conn: Connection) -> None:
+    from models.project import Project
+
+    # ix_project_search is created on Postgres only (see its ddl_if)
+    for index in Project.__table__.indexes:
+        if index.name == "ix_project_search":
+            index.create(conn, checkfirst=True)
+
+def partition_projects(conn: Connection, partitions: int) -> bool:
+    """
+    Rebuild project as a table hash-partitioned by owner_id, copying its rows.
+    Postgres only, and a no-op when it is already partitioned. The primary key
+    becomes (id, owner_id), as a partitioned table's unique constraints must
+    include the partition key; ids stay unique through the shared sequence.
+    The table is locked for the copy, so convert a large one in a maintenance
+    window. Returns whether anything was done.
+    """
+    from models.project import Project
+
+    if conn.dialect.name != "postgresql" or partitions < 1:
+        return False
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('project')")).scalar()
+    if kind != "r":
+        return False
+
+    conn.execute(text("ALTER TABLE project RENAME TO project_unpartitioned"))
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('project_unpartitioned', 'id')")).scalar_one()
+    conn.execute(text(
+        "CREATE TABLE project (LIKE project_unpartitioned INCLUDING DEFAULTS) PARTITION BY HASH (owner_id)"
+    ))
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"CREATE TABLE project_p{remainder} PARTITION OF project "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+    # The sequence belongs to the old table's column and would go with it
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY project.id"))
+    conn.execute(text("INSERT INTO project SELECT * FROM project_unpartitioned"))
+    conn.execute(text("DROP TABLE project_unpartitioned"))
+
+    # Constraints and indexes after the copy, under their original names
+    conn.execute(text("ALTER TABLE project ADD CONSTRAINT project_pkey PRIMARY KEY (id, owner_id)"))
+    conn.execute(text(
+        'ALTER TABLE project ADD CONSTRAINT project_owner_id_fkey FOREIGN KEY (owner_id) REFERENCES "user" (id)'
+    ))
+    for index in Project.__table__.indexes:
+        index.create(conn)
+    return True
+
+def _project_partitions(conn: Connection) -> bool:
+    from config.config import settings
+
+    # Stays pending on Postgres until PROJECT_PARTITIONS is set
+    if conn.dialect.name == "postgresql" and settings.PROJECT_PARTITIONS < 1:
+        return False
+    partition_projects(conn, settings.PROJECT_PARTITIONS)
+    return True
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], Optional[bool]]]] = [
+    ("0001_initial_schema", _initial_schema),
+    ("0002_project_indexes", _project_indexes),
+    ("0003_refresh_tokens", _refresh_tokens),
+    ("0004_background_jobs", _background_jobs),
+    ("0005_project_search", _project_search),
+    ("0006_project_partitions", _project_partitions),
+]
+
+def applied_migrations(bind: Engine) -> List[str]:
+    with bind.begin() as conn:
+        _migration_metadata.create_all(conn)
+        return list(conn.scalars(select(schema_migrations.c.version)))
+
+def run_migrations(bind: Optional[Engine] = None) -> List[str]:
+    """Apply pending migrations to bind (the app engine by default) and return their versions."""
+    if bind is None:
+        from core.db import engine as bind
+
+    done = set(applied_migrations(bind))
+    applied = []
+    for version, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            if migrate(conn) is False:
+                continue
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.now()))
+        applied.append(version)
+    return applied
+
+if __name__ == "__main__":
+    applied = run_migrations()
+    print("\n".join(f"applied {version}" for version in applied) or "schema is up to date")
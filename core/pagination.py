@@ -0,0 +1,54 @@
+import base64
+from fastapi import Response
+from typing import List, Optional
+from config.config import settings
+from core.exceptions import BadRequestException
+from core.tracing import TracedORJSONResponse
+
+_MAX_POSITION = 2**63 - 1
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the keyset position of the last row of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Decode a cursor produced by encode_cursor back into the last seen id."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise BadRequestException(detail="Invalid cursor")
+    # Positions are ids or offsets: anything outside a signed 64-bit
+    # column's non-negative range was never handed out
+    if not 0 <= position <= _MAX_POSITION:
+        raise BadRequestException(detail="Invalid cursor")
+    return position
+
+def page_size_for(limit: Optional[int]) -> int:
+    """The page size for a requested limit, PROJECTS_PAGE_SIZE when none was given."""
+    return limit or settings.PROJECTS_PAGE_SIZE
+
+def page_response(items: List, page_size: int, response: Response, next_position: Optional[int] = None):
+    """
+    Return a keyset page, with the cursor for the next one in X-Next-Cursor.
+
+    items are response models or plain row dicts; with FAST_JSON on, models
+    are dumped to dicts for the orjson encoder.
+    The cursor holds the last item's id unless next_position is given, as
+    it is for ranked results paged by offset.
+    """
+    next_cursor = None
+    if len(items) == page_size:
+        last = items[-1]
+        if next_position is None:
+            next_position = last["id"] if isinstance(last, dict) else last.id
+        next_cursor = encode_cursor(next_position)
+    if settings.FAST_JSON:
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        rows = [item if isinstance(item, dict) else item.model_dump() for item in items]
+        return TracedORJSONResponse(rows, headers=headers)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
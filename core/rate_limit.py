@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from config.config import settings
+from core.cache import LRUCache
+from core.exceptions import TooManyRequestsException
+import asyncio
+import math
+import threading
+import time
+
+class RateLimitStore(ABC):
+    """Where rate limit state lives; shared by every key of one limiter."""
+
+    # True when calls do network I/O and should be kept off the event loop
+    blocking = False
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, per_second: float) -> float:
+        """
+        Take one token from key's bucket.
+
+        Returns 0 when the request may proceed, otherwise the seconds until
+        a token is available again.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+class MemoryRateLimitStore(RateLimitStore):
+    """In-process token buckets, at most maxsize of them (least recently used go first)."""
+
+    def __init__(self, maxsize: int):
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated_at) * per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / per_second
+            # A bucket left alone until it is full again is the same as no bucket
+            self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / per_second)
+            return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Limits shared by all workers, for any client with Redis' incr / expire commands.
+
+    Uses fixed windows of capacity / per_second seconds, each allowing
+    capacity requests: one atomic INCR per request and no scripting.
+    Bursts at a window edge can reach twice the capacity.
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+
+    def take(self, key: str, capacity: int, per_second: float) -> float:
+        window = max(1, math.ceil(capacity / per_second))
+        now = time.time()
+        window_key = f"{self._prefix}{key}:{int(now // window)}"
+        count = self._client.incr(window_key)
+        if count == 1:
+            self._client.expire(window_key, window)
+        if count > capacity:
+            return window - now % window
+        return 0.0
+
+    def clear(self) -> None:
+        # Windows expire on their own
+        pass
+
+def build_rate_limit_store(kind: str) -> RateLimitStore:
+    """Create the store named by RATE_LIMIT_BACKEND."""
+    if kind == "memory":
+        return MemoryRateLimitStore(maxsize=settings.RATE_LIMIT_MAX_KEYS)
+    if kind == "redis":
+        # Optional dependency, only needed when a Redis backend is configured
+        import redis
+
+        return RedisRateLimitStore(redis.Redis.from_url(settings.REDIS_URL))
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+class AuthRateLimiter:
+    """
+    Per client IP and per username limits for the login and register endpoints.
+
+    Checked before the service runs, so a throttled attempt costs neither a
+    database lookup nor a bcrypt hash.
+    """
+
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"allowed": 0, "throttled_ip": 0, "throttled_username": 0}
+
+    def check(self, action: str, client_ip: Optional[str], username: str) -> None:
+        """Raise 429 when action ("login" or "register") is over either limit."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        wait = self._take(
+            f"{action}:ip:{client_ip}", settings.AUTH_RATE_LIMIT_IP_BURST, settings.AUTH_RATE_LIMIT_IP_PER_MINUTE
+        )
+        if wait:
+            self._throttled("throttled_ip", wait)
+        # Only spend the username's tokens on attempts its IP was allowed to make
+        wait = self._take(
+            f"{action}:user:{username.lower()}",
+            settings.AUTH_RATE_LIMIT_USERNAME_BURST,
+            settings.AUTH_RATE_LIMIT_USERNAME_PER_MINUTE,
+        )
+        if wait:
+            self._throttled("throttled_username", wait)
+        self._count("allowed")
+
+    async def check_async(self, action: str, client_ip: Optional[str], username: str) -> None:
+        if self.store.blocking:
+            await asyncio.to_thread(self.check, action, client_ip, username)
+        else:
+            self.check(action, client_ip, username)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        self.store.clear()
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def _take(self, key: str, burst: int, per_minute: int) -> float:
+        # A PER_MINUTE of 0 turns that limit off
+        if per_minute <= 0:
+            return 0.0
+        return self.store.take(key, burst, per_minute / 60)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _throttled(self, counter: str, wait: float) -> None:
+        self._count(counter)
+        raise TooManyRequestsException(retry_after=math.ceil(wait))
+
+auth_rate_limiter = AuthRateLimiter(build_rate_limit_store(settings.RATE_LIMIT_BACKEND))
@@ -0,0 +1,147 @@
+"""
+Read replica routing.
+
+With DATABASE_REPLICA_URLS set, get_read_session (core.dependencies) hands
+read-only service methods a session on a replica instead of the primary.
+Replicas are picked round robin among the healthy ones. A replica is taken
+out when a query on it fails with a connection error, and every
+DB_REPLICA_HEALTH_CHECK_SECONDS all replicas are probed with SELECT 1 (and,
+on Postgres with DB_REPLICA_MAX_LAG_SECONDS set, for replay lag). Reads fall
+back to the primary while no replica is healthy.
+
+Replicas lag the primary, so a user who has just written reads from the
+primary for DB_READ_YOUR_WRITES_SECONDS: services call record_write just
+before committing on the user's behalf, so no read can slip in between.
+"""
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine
+from config.config import settings
+from core.cache import build_cache_backend
+from core.db import engine_options
+from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ReplicaSet:
+    def __init__(self, engines: List[Engine], async_urls: Optional[List[str]] = None):
+        self.engines = engines
+        self._async_urls = async_urls or []
+        self._async_engines: Optional[List[AsyncEngine]] = None
+        self._healthy = [True] * len(engines)
+        self._lag: List[Optional[float]] = [None] * len(engines)
+        self._checked_at = time.monotonic()
+        self._checking = False
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        for index, engine in enumerate(engines):
+            self._watch(engine, index)
+
+    def pick(self) -> Optional[int]:
+        """Index of the next healthy replica, or None to read from the primary."""
+        healthy = [index for index, ok in enumerate(self._healthy) if ok]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.DB_REPLICA_HEALTH_CHECK_SECONDS
+
+    def check(self) -> None:
+        """Probe every replica; one caller at a time, the others skip."""
+        with self._lock:
+            if self._checking:
+                return
+            self._checking = True
+        try:
+            for index, engine in enumerate(self.engines):
+                self._healthy[index] = self._probe(index, engine)
+        finally:
+            self._checked_at = time.monotonic()
+            self._checking = False
+
+    def async_engine(self, index: int) -> AsyncEngine:
+        if self._async_engines is None:
+            self._async_engines = [create_async_engine(url, **engine_options(url)) for url in self._async_urls]
+            for replica, engine in enumerate(self._async_engines):
+                self._watch(engine.sync_engine, replica)
+        return self._async_engines[index]
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"healthy": self._healthy[index], "lag_seconds": self._lag[index]}
+            for index in range(len(self.engines))
+        ]
+
+    def _probe(self, index: int, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                if engine.dialect.name == "postgresql" and settings.DB_REPLICA_MAX_LAG_SECONDS:
+                    lag = conn.execute(text(
+                        "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                    )).scalar_one()
+                    self._lag[index] = float(lag)
+                    return self._lag[index] <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        except Exception:
+            logger.warning("Read replica %d failed its health check", index, exc_info=True)
+            return False
+        return True
+
+    def _watch(self, engine: Engine, index: int) -> None:
+        def mark_down(context):
+            if context.is_disconnect or context.connection is None:
+                logger.warning("Read replica %d is unreachable; reading from the others", index)
+                self._healthy[index] = False
+
+        event.listen(engine, "handle_error", mark_down)
+
+def build_replica_set() -> Optional[ReplicaSet]:
+    if not settings.DATABASE_REPLICA_URLS:
+        return None
+    engines = [create_engine(url, **engine_options(url)) for url in settings.DATABASE_REPLICA_URLS]
+    return ReplicaSet(engines, settings.async_replica_urls)
+
+replicas = build_replica_set()
+
+# Users who wrote within the read-your-writes window; None ("none") turns it off
+_recent_writers = build_cache_backend(
+    settings.READ_YOUR_WRITES_BACKEND, maxsize=100000, ttl=settings.DB_READ_YOUR_WRITES_SECONDS
+)
+
+def _writer_key(user_id: int) -> str:
+    return f"wrote:{user_id}"
+
+def record_write(user_id: int) -> None:
+    """Keep user_id's reads on the primary for DB_READ_YOUR_WRITES_SECONDS."""
+    if replicas is not None and _recent_writers is not None and settings.DB_READ_YOUR_WRITES_SECONDS:
+        _recent_writers.set(_writer_key(user_id), b"1")
+
+async def record_write_async(user_id: int) -> None:
+    if replicas is not None and _recent_writers is not None and _recent_writers.blocking:
+        await asyncio.to_thread(record_write, user_id)
+    else:
+        record_write(user_id)
+
+def replica_for(user_id: int) -> Optional[int]:
+    """Replica to serve user_id's reads from, or None for the primary."""
+    if replicas is None:
+        return None
+    if _recent_writers is not None and _recent_writers.get(_writer_key(user_id)) is not None:
+        return None
+    if replicas.check_due():
+        replicas.check()
+    return replicas.pick()
+
+async def replica_for_async(user_id: int) -> Optional[int]:
+    # Health checks and a Redis lookup block; keep them off the event loop
+    blocking = _recent_writers is not None and _recent_writers.blocking
+    if replicas is not None and (blocking or replicas.check_due()):
+        return await asyncio.to_thread(replica_for, user_id)
+    return replica_for(user_id)
@@ -0,0 +1,202 @@
+"""
+Ranked search over project name and description.
+
+On Postgres, ProjectService queries the GIN index on the weighted tsvector
+built by models.project.project_search_vector. Other databases use the
+in-process inverted index below, loaded from the project table by the first
+search and then kept current by ProjectService writes. Every worker process
+holds its own copy and only sees its own writes, so run several workers
+against Postgres.
+
+Both backends treat the query the same way: words are ANDed, and the last
+word also matches as a prefix once it has PROJECT_SEARCH_MIN_PREFIX
+characters, so results narrow while the user types.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config.config import settings
+import heapq
+import math
+import re
+import threading
+
+_WORD = re.compile(r"\w+")
+
+# Per-occurrence weights of the name and description fields, matching the
+# A and B weights ts_rank_cd gives the Postgres search vector
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+def search_terms(query: str) -> List[str]:
+    return _WORD.findall(query.lower())
+
+def prefix_allowed(term: str) -> bool:
+    return len(term) >= settings.PROJECT_SEARCH_MIN_PREFIX
+
+def tsquery(terms: Sequence[str]) -> str:
+    """to_tsquery text for search_terms output: all words, the last one as a prefix."""
+    words = list(terms)
+    if prefix_allowed(words[-1]):
+        words[-1] += ":*"
+    return " & ".join(words)
+
+class ProjectSearchIndex:
+    """Thread-safe inverted index from words to weighted project ids."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._documents: Dict[int, Tuple[str, ...]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._loaders = 0
+        # Writes made while a load is reading the table, replayed after it
+        self._pending: List[Tuple[int, Optional[str], Optional[str], bool]] = []
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def begin_load(self) -> None:
+        """Call before reading the rows passed to finish_load."""
+        with self._lock:
+            self._loaders += 1
+
+    def finish_load(self, rows: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        with self._lock:
+            self._loaders -= 1
+            if not self._loaded:
+                for project_id, name, description in rows:
+                    self._add(project_id, name, description, keep_sorted=False)
+                self._vocabulary = sorted(self._postings)
+                for project_id, name, description, removed in self._pending:
+                    if removed:
+                        self._remove(project_id)
+                    else:
+                        self._add(project_id, name, description)
+                self._loaded = True
+            if self._loaded or not self._loaders:
+                self._pending.clear()
+
+    def abort_load(self) -> None:
+        with self._lock:
+            self._loaders -= 1
+            if not self._loaders:
+                self._pending.clear()
+
+    def add(self, project_id: int, name: str, description: Optional[str]) -> None:
+        """Index a created or updated project; a no-op until the index is loaded."""
+        with self._lock:
+            if self._loaded:
+                self._add(project_id, name, description)
+            elif self._loaders:
+                self._pending.append((project_id, name, description, False))
+
+    def remove(self, project_id: int) -> None:
+        with self._lock:
+            if self._loaded:
+                self._remove(project_id)
+            elif self._loaders:
+                self._pending.append((project_id, None, None, True))
+
+    def search(self, terms: Sequence[str], limit: int, offset: int = 0) -> List[int]:
+        """Ids of the projects matching every term, best match first."""
+        with self._lock:
+            total = len(self._documents)
+            matched = []
+            for position, term in enumerate(terms):
+                is_prefix = position == len(terms) - 1 and prefix_allowed(term)
+                words = self._words(term, is_prefix)
+                if not words:
+                    return []
+                matched.append([(self._postings[word], math.log(1 + total / len(self._postings[word]))) for word in words])
+            # Score the rarest term's projects, then only probe the others for them
+            matched.sort(key=lambda postings: sum(len(posting) for posting, _ in postings))
+            scores = _term_scores(matched[0])
+            for postings in matched[1:]:
+                if len(postings) == 1:
+                    posting, idf = postings[0]
+                    scores = {
+                        project_id: score + weight * idf
+                        for project_id, score in scores.items()
+                        if (weight := posting.get(project_id))
+                    }
+                else:
+                    scores = {
+                        project_id: score + best
+                        for project_id, score in scores.items()
+                        if (best := max(posting.get(project_id, 0.0) * idf for posting, idf in postings))
+                    }
+                if not scores:
+                    return []
+        best = heapq.nsmallest(offset + limit, scores.items(), key=_rank_key)
+        return [project_id for project_id, _ in best[offset:]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._vocabulary.clear()
+            self._pending.clear()
+            self._loaded = False
+            self._loaders = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "loaded": int(self._loaded),
+            "documents": len(self._documents),
+            "terms": len(self._vocabulary),
+        }
+
+    def _words(self, term: str, is_prefix: bool) -> List[str]:
+        if not is_prefix:
+            return [term] if term in self._postings else []
+        words = []
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            words.append(self._vocabulary[position])
+            position += 1
+        return words
+
+    def _add(self, project_id: int, name: str, description: Optional[str], keep_sorted: bool = True) -> None:
+        if project_id in self._documents:
+            self._remove(project_id)
+        weights: Dict[str, float] = {}
+        for word in search_terms(name):
+            weights[word] = weights.get(word, 0.0) + NAME_WEIGHT
+        for word in search_terms(description or ""):
+            weights[word] = weights.get(word, 0.0) + DESCRIPTION_WEIGHT
+        for word, weight in weights.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                if keep_sorted:
+                    insort(self._vocabulary, word)
+            postings[project_id] = weight
+        self._documents[project_id] = tuple(weights)
+
+    def _remove(self, project_id: int) -> None:
+        for word in self._documents.pop(project_id, ()):
+            postings = self._postings[word]
+            del postings[project_id]
+            if not postings:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+
+def _term_scores(postings: List[Tuple[Dict[int, float], float]]) -> Dict[int, float]:
+    """Score of each project for one query term: its best matching word."""
+    if len(postings) == 1:
+        posting, idf = postings[0]
+        return {project_id: weight * idf for project_id, weight in posting.items()}
+    scores: Dict[int, float] = {}
+    for posting, idf in postings:
+        for project_id, weight in posting.items():
+            score = weight * idf
+            if score > scores.get(project_id, 0.0):
+                scores[project_id] = score
+    return scores
+
+def _rank_key(item: Tuple[int, float]) -> Tuple[float, int]:
+    return -item[1], item[0]
+
+project_search_index = ProjectSearchIndex()
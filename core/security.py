@@ -1,19 +1,116 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError
 from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
 from config.config import settings
-from typing import Dict, Optional, Any
+from core.cache import LRUCache
+from core.exceptions import ServiceUnavailableException
+from core.tracing import span
+from typing import Callable, Dict, List, Optional, Any, Tuple
+import asyncio
+import hashlib
+import heapq
+import hmac
+import secrets
+import threading
+import time
 
-# Password context for hashing and verification
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt and jose.jwt (which pulls in cryptography) are imported on
+# first use rather than at startup, to keep cold starts short.
+_pwd_context = None
+
+def get_pwd_context():
+    """Password context for hashing and verification, built on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        # deprecated="auto": every scheme but the first only verifies and is
+        # reported by needs_update
+        _pwd_context = CryptContext(
+            schemes=settings.PASSWORD_SCHEMES,
+            deprecated="auto",
+            **_rounds_options(settings.BCRYPT_ROUNDS),
+            **settings.PASSWORD_HASH_OPTIONS,
+        )
+    return _pwd_context
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Change the bcrypt cost of new hashes, and the minimum below which hashes need updating."""
+    get_pwd_context().update(**_rounds_options(rounds))
+
+def _rounds_options(rounds: int) -> Dict[str, int]:
+    if "bcrypt" not in settings.PASSWORD_SCHEMES:
+        return {}
+    return {"bcrypt__default_rounds": rounds, "bcrypt__min_rounds": rounds}
+
+def password_needs_update(hashed_password: str) -> bool:
+    """True when a hash does not match the current policy; parses the hash, no hashing."""
+    return get_pwd_context().needs_update(hashed_password)
+
+def __getattr__(name: str) -> Any:
+    # Keeps security.pwd_context working without importing passlib eagerly
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class PasswordHasherPool:
+    """Bounded thread pool for bcrypt work with a fixed-size admission queue."""
+
+    def __init__(self, workers: int, queue_size: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._capacity = workers + queue_size
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Schedule fn, or raise a 503 when the pool and its queue are full."""
+        with self._lock:
+            if self._pending >= self._capacity:
+                raise ServiceUnavailableException(detail="Too many concurrent authentication requests")
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+password_hasher = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with span("bcrypt"):
+        if not settings.PASSWORD_HASH_POOL:
+            return get_pwd_context().verify(plain_password, hashed_password)
+        return password_hasher.submit(get_pwd_context().verify, plain_password, hashed_password).result()
 
 def get_password_hash(password: str) -> str:
     """Generate a password hash."""
-    return pwd_context.hash(password)
+    with span("bcrypt"):
+        if not settings.PASSWORD_HASH_POOL:
+            return get_pwd_context().hash(password)
+        return password_hasher.submit(get_pwd_context().hash, password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    with span("bcrypt"):
+        if not settings.PASSWORD_HASH_POOL:
+            return await asyncio.to_thread(get_pwd_context().verify, plain_password, hashed_password)
+        return await asyncio.wrap_future(
+            password_hasher.submit(get_pwd_context().verify, plain_password, hashed_password)
+        )
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash without blocking the event loop."""
+    with span("bcrypt"):
+        if not settings.PASSWORD_HASH_POOL:
+            return await asyncio.to_thread(get_pwd_context().hash, password)
+        return await asyncio.wrap_future(password_hasher.submit(get_pwd_context().hash, password))
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -24,7 +121,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.now() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time())})
+    from jose import jwt
     
     encoded_jwt = jwt.encode(
         to_encode, 
@@ -34,10 +132,124 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     
     return encoded_jwt
 
+def create_refresh_token() -> Tuple[str, str, str]:
+    """New refresh token as (token, token id, stored hash of its secret)."""
+    token_id = secrets.token_urlsafe(16)
+    secret = secrets.token_urlsafe(32)
+    return f"{token_id}.{secret}", token_id, _refresh_secret_hash(secret)
+
+def parse_refresh_token(token: str) -> Optional[Tuple[str, str]]:
+    """Split a refresh token into (token id, secret), or None if malformed."""
+    token_id, _, secret = token.partition(".")
+    if not token_id or not secret:
+        return None
+    return token_id, secret
+
+def refresh_secret_matches(secret: str, token_hash: str) -> bool:
+    # HMAC-SHA256 keyed with SECRET_KEY: a leaked table cannot mint tokens,
+    # and checking costs microseconds rather than a bcrypt round
+    return hmac.compare_digest(_refresh_secret_hash(secret), token_hash)
+
+def _refresh_secret_hash(secret: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+class TokenCache:
+    """
+    Decoded payloads of verified tokens keyed by the token's SHA-256 digest.
+
+    Entries live until the token's exp claim, so a hit skips the signature
+    check and claim validation without extending a token's lifetime.
+    Revocations are not bounded by maxsize: each is kept until the token
+    expires, as evicting one would let the token through again.
+    """
+
+    def __init__(self, maxsize: int):
+        self._payloads = LRUCache(maxsize=maxsize)
+        self._revoked: Dict[bytes, float] = {}  # digest -> exp
+        self._revoked_by_expiry: List[Tuple[float, bytes]] = []  # heap for pruning
+        self._revoked_lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        payload = self._payloads.get(_token_digest(token))
+        # Callers get their own copy so the cached payload cannot be mutated
+        return dict(payload) if payload is not None else None
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        ttl = _seconds_until_expiry(payload)
+        if ttl > 0:
+            self._payloads.set(_token_digest(token), dict(payload), ttl=ttl)
+
+    def is_revoked(self, token: str) -> bool:
+        expires_at = self._revoked.get(_token_digest(token))
+        return expires_at is not None and expires_at > time.time()
+
+    def revoke(self, token: str) -> None:
+        """Reject token from now on, until it would have expired anyway."""
+        from jose import jwt
+
+        digest = _token_digest(token)
+        self._payloads.delete(digest)
+        try:
+            expires_at = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            return
+        if expires_at is None:
+            return
+        now = time.time()
+        with self._revoked_lock:
+            # Expired tokens fail verification anyway; drop their entries
+            while self._revoked_by_expiry and self._revoked_by_expiry[0][0] <= now:
+                _, expired = heapq.heappop(self._revoked_by_expiry)
+                if self._revoked.get(expired, now + 1) <= now:
+                    del self._revoked[expired]
+            if float(expires_at) > now:
+                self._revoked[digest] = float(expires_at)
+                heapq.heappush(self._revoked_by_expiry, (float(expires_at), digest))
+
+    def clear(self) -> None:
+        self._payloads.clear()
+        with self._revoked_lock:
+            self._revoked.clear()
+            self._revoked_by_expiry.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._payloads.stats(), "revoked": len(self._revoked)}
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _seconds_until_expiry(payload: Dict[str, Any]) -> float:
+    expires_at = payload.get("exp")
+    if expires_at is None:
+        return 0
+    return float(expires_at) - time.time()
+
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify a JWT token."""
-    return jwt.decode(
+    with span("jwt"):
+        return _verify_token(token)
+
+def _verify_token(token: str) -> Dict[str, Any]:
+    if token_cache.is_revoked(token):
+        raise JWTError("Token has been revoked")
+    if settings.TOKEN_CACHE_ENABLED:
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+
+    from jose import jwt
+
+    payload = jwt.decode(
         token, 
         settings.SECRET_KEY, 
         algorithms=[settings.ALGORITHM]
-    )
\ No newline at end of file
+    )
+    if settings.TOKEN_CACHE_ENABLED:
+        token_cache.set(token, payload)
+    return payload
+
+def revoke_token(token: str) -> None:
+    """Revocation hook: the token is rejected even while still unexpired."""
+    token_cache.revoke(token)
@@ -0,0 +1,176 @@
+"""
+In-process snapshot of the project table for unfiltered listing.
+
+Rows are held column-wise: the ids in a typed array and each row's JSON
+document pre-serialized in a parallel list, so a page is a bisect on the
+ids plus a join of byte strings. Built pages are memoized until the next
+change.
+
+ProjectService refreshes the snapshot at most every
+PROJECT_SNAPSHOT_REFRESH_SECONDS by reading the rows whose updated_at is
+past the high-water mark, the later of the newest updated_at seen and the
+start of the previous refresh, less a lookback for transactions that
+commit out of timestamp order. It reloads in full when its row count stops
+matching the table, which is how deletes by other processes show up. One
+request refreshes at a time while the others read the current snapshot.
+Writes through ProjectService in this process are applied directly.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config.config import settings
+from core.cache import LRUCache
+import orjson
+import threading
+import time
+
+@dataclass
+class SnapshotRefresh:
+    since: Optional[datetime]  # updated_at lower bound; None reads every row
+    started: datetime
+
+@dataclass
+class SnapshotPage:
+    body: bytes  # JSON array of ProjectResponse documents
+    last_id: Optional[int]  # keyset position of the next page, None on the last one
+
+class ProjectSnapshot:
+    __slots__ = (
+        "_ids", "_rows", "_pages", "_lock", "_loaded",
+        "_high_water", "_newest", "_refreshed_at", "_refreshing", "_full_reload", "_counters",
+    )
+
+    def __init__(self):
+        self._ids = array("q")
+        self._rows: List[bytes] = []
+        self._pages = LRUCache(maxsize=settings.PROJECT_SNAPSHOT_PAGE_CACHE_SIZE)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._high_water: Optional[datetime] = None
+        self._newest: Optional[datetime] = None  # largest updated_at held
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self._full_reload = True
+        self._counters = {"refreshes": 0, "full_reloads": 0}
+
+    def needs_refresh(self) -> bool:
+        return (
+            self._full_reload
+            or time.monotonic() - self._refreshed_at >= settings.PROJECT_SNAPSHOT_REFRESH_SECONDS
+        )
+
+    def begin_refresh(self) -> Optional[SnapshotRefresh]:
+        """
+        Claim the next refresh, or None when the snapshot is fresh or another
+        request is already refreshing it. Follow with apply or abort_refresh.
+        """
+        with self._lock:
+            if not self.needs_refresh() or (self._refreshing and self._loaded):
+                return None
+            self._refreshing = True
+            since = None
+            if not self._full_reload and self._high_water is not None:
+                since = self._high_water - timedelta(seconds=settings.PROJECT_SNAPSHOT_LOOKBACK_SECONDS)
+            return SnapshotRefresh(since=since, started=datetime.now())
+
+    def apply(self, refresh: SnapshotRefresh, rows: Iterable[Dict[str, Any]], total: int) -> bool:
+        """
+        Merge the rows read for refresh (ordered by id) and check them against
+        the table's row count. Returns False when the counts disagree; the
+        caller then refreshes again, which reloads every row.
+        """
+        with self._lock:
+            if refresh.since is None:
+                self._ids, self._rows = array("q"), []
+                self._newest = None
+                self._counters["full_reloads"] += 1
+            high_water = refresh.started
+            for row in rows:
+                self._merge(row)
+                high_water = max(high_water, row["updated_at"])
+            self._high_water = high_water
+            self._pages.clear()
+            self._counters["refreshes"] += 1
+            self._loaded = True
+            self._refreshing = False
+            self._refreshed_at = time.monotonic()
+            self._full_reload = len(self._ids) != total
+            return not self._full_reload
+
+    def abort_refresh(self) -> None:
+        with self._lock:
+            self._refreshing = False
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """Apply a created or updated project; a no-op before the first load."""
+        with self._lock:
+            if self._loaded:
+                self._merge(row)
+                self._pages.clear()
+
+    def discard(self, project_id: int) -> None:
+        with self._lock:
+            position = bisect_left(self._ids, project_id)
+            if position < len(self._ids) and self._ids[position] == project_id:
+                del self._ids[position]
+                del self._rows[position]
+                self._pages.clear()
+
+    def version(self) -> Tuple[int, Optional[datetime]]:
+        """Row count and newest updated_at of the snapshot, for collection validators."""
+        with self._lock:
+            return len(self._ids), self._newest
+
+    def page(self, limit: int, after_id: Optional[int] = None) -> SnapshotPage:
+        key = (limit, after_id)
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+        with self._lock:
+            start = bisect_right(self._ids, after_id) if after_id is not None else 0
+            end = min(start + limit, len(self._ids))
+            body = b"[" + b",".join(self._rows[start:end]) + b"]"
+            last_id = self._ids[end - 1] if end - start == limit else None
+            page = SnapshotPage(body=body, last_id=last_id)
+            self._pages.set(key, page)
+        return page
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ids, self._rows = array("q"), []
+            self._pages.clear()
+            self._loaded = False
+            self._high_water = None
+            self._newest = None
+            self._refreshed_at = 0.0
+            self._refreshing = False
+            self._full_reload = True
+            self._counters = {"refreshes": 0, "full_reloads": 0}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rows": len(self._ids),
+            "pages": len(self._pages),
+            **self._counters,
+        }
+
+    def _merge(self, row: Dict[str, Any]) -> None:
+        project_id = row["id"]
+        document = orjson.dumps(row)
+        if self._newest is None or row["updated_at"] > self._newest:
+            self._newest = row["updated_at"]
+        if not self._ids or project_id > self._ids[-1]:
+            # New projects have the highest ids
+            self._ids.append(project_id)
+            self._rows.append(document)
+            return
+        position = bisect_left(self._ids, project_id)
+        if position < len(self._ids) and self._ids[position] == project_id:
+            self._rows[position] = document
+        else:
+            self._ids.insert(position, project_id)
+            self._rows.insert(position, document)
+
+project_snapshot = ProjectSnapshot()
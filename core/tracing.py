@@ -0,0 +1,228 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.config import settings
+import asyncio
+import functools
+import itertools
+import threading
+import time
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+@dataclass
+class RequestTrace:
+    """Time spent per span name ("db", "bcrypt", "jwt", "serialize") in one request."""
+    spans: Dict[str, List[float]] = field(default_factory=dict)  # name -> [count, seconds]
+    profile: bool = False
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.spans.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"{name};dur={seconds * 1000:.2f};desc=\"{int(count)}x\"" for name, (count, seconds) in self.spans.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+# Shared by the request's task, its threadpool calls and child tasks
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+class Metrics:
+    """Process-wide aggregates rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.durations: Dict[Tuple[str, str], List[float]] = {}  # bucket counts + [sum, count]
+        self.spans: Dict[str, List[float]] = {}  # name -> [count, seconds]
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.durations.setdefault((method, route), [0] * len(DURATION_BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    histogram[index] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def observe_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.durations.clear()
+            self.spans.clear()
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        lines = [
+            "# HELP http_requests_total Requests served, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP http_request_duration_seconds Request latency.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), histogram in sorted(self.durations.items()):
+                labels = f'method="{method}",route="{route}"'
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram[-1]}")
+
+            lines += [
+                "# HELP span_duration_seconds Time spent in instrumented operations.",
+                "# TYPE span_duration_seconds summary",
+            ]
+            for name, (count, seconds) in sorted(self.spans.items()):
+                lines.append(f'span_duration_seconds_sum{{span="{name}"}} {seconds:.6f}')
+                lines.append(f'span_duration_seconds_count{{span="{name}"}} {int(count)}')
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def record_span(name: str, seconds: float) -> None:
+    """Attribute seconds of work to the current request and the global totals."""
+    if not settings.TRACING_ENABLED:
+        return
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+    metrics.observe_span(name, seconds)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+class TracedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return super().render(content)
+
+class TracedORJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return super().render(content)
+
+class TracingMiddleware:
+    """ASGI middleware that opens a RequestTrace per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._request_counter = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        every = settings.PROFILE_EVERY_N_REQUESTS
+        trace = RequestTrace(profile=every > 0 and next(self._request_counter) % every == 0)
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    header = trace.server_timing(time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - start,
+            )
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute that runs sampled requests' endpoints under pyinstrument.
+
+    The profiler is started inside the endpoint call so that sync endpoints
+    are sampled on the threadpool thread that actually runs them.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+def _profiled(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # include_router rebuilds routes from the already wrapped endpoint
+    if getattr(endpoint, "__profiled__", False):
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profiler = _start_profiler(endpoint, async_mode="enabled")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _stop_profiler(profiler, endpoint)
+        async_wrapper.__profiled__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiler = _start_profiler(endpoint, async_mode="disabled")
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _stop_profiler(profiler, endpoint)
+    wrapper.__profiled__ = True
+    return wrapper
+
+def _start_profiler(endpoint: Callable[..., Any], async_mode: str):
+    trace = _current_trace.get()
+    if trace is None or not trace.profile:
+        return None
+    # Optional dependency, only imported when profiling is switched on
+    from pyinstrument import Profiler
+
+    profiler = Profiler(async_mode=async_mode)
+    profiler.start()
+    return profiler
+
+def _stop_profiler(profiler, endpoint: Callable[..., Any]) -> None:
+    if profiler is None:
+        return
+    profiler.stop()
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint.__name__}-{time.monotonic_ns()}.html"
+    path.write_text(profiler.output_html())
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from config.config import settings
+from core.cache import LRUCache
+from models.user import User, UserRole
+import threading
+import time
+
+@dataclass(frozen=True)
+class UserState:
+    """The parts of a user that authorization decisions depend on."""
+    id: int
+    username: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserState":
+        return cls(id=user.id, username=user.username, role=user.role, is_active=user.is_active)
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional["UserState"]:
+        # Tokens issued before these claims existed fall back to the database
+        if "role" not in payload or "is_active" not in payload:
+            return None
+        return cls(
+            id=int(payload["sub"]),
+            username=payload.get("username", ""),
+            role=UserRole(payload["role"]),
+            is_active=bool(payload["is_active"]),
+        )
+
+    def to_user(self) -> User:
+        # A detached projection: enough for permission checks and ownership,
+        # never added to a session.
+        return User(
+            id=self.id,
+            username=self.username,
+            role=self.role,
+            is_active=self.is_active,
+            hashed_password="",
+        )
+
+class UserStateCache:
+    """
+    User state keyed by id, used by stateless authentication.
+
+    State is at most the TTL old: cached state for the TTL after it was read
+    from the database, and token claims only while the token itself is
+    younger than the TTL. Past that, the database is asked again. Invalidation
+    takes effect at once in this process; other worker processes keep the
+    markers of their own, so there a change shows within the TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, token_lifetime: float):
+        self._states = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._ttl = ttl
+        self._token_lifetime = token_lifetime
+        self._invalidated_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, payload: Dict[str, Any]) -> Optional[UserState]:
+        """State for the token's subject, or None when the database must be asked."""
+        user_id = int(payload["sub"])
+        state = self._states.get(user_id)
+        if state is not None:
+            return state
+        issued_at = payload.get("iat")
+        if issued_at is None or time.time() - issued_at >= self._ttl:
+            return None
+        if self._issued_before_invalidation(user_id, issued_at):
+            return None
+        state = UserState.from_claims(payload)
+        if state is not None:
+            self._states.set(user_id, state)
+        return state
+
+    def set(self, state: UserState) -> None:
+        self._states.set(state.id, state)
+
+    def invalidate(self, user_id: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._invalidated_at[user_id] = now
+            # Markers only matter while tokens issued before them are valid
+            horizon = now - self._token_lifetime
+            for stale_id in [uid for uid, at in self._invalidated_at.items() if at < horizon]:
+                del self._invalidated_at[stale_id]
+        self._states.delete(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidated_at.clear()
+        self._states.clear()
+
+    def _issued_before_invalidation(self, user_id: int, issued_at: float) -> bool:
+        invalidated_at = self._invalidated_at.get(user_id)
+        return invalidated_at is not None and issued_at <= invalidated_at
+
+user_state_cache = UserStateCache(
+    maxsize=settings.USER_STATE_CACHE_SIZE,
+    ttl=settings.USER_STATE_CACHE_TTL,
+    token_lifetime=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+def invalidate_user_state(user_id: int) -> None:
+    """Call after changing a user's role or active flag, or deleting them."""
+    user_state_cache.invalidate(user_id)
@@ -1,18 +1,36 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from api import auth_router, project_router
+from api import (
+    auth_router,
+    project_router,
+    user_router,
+    async_auth_router,
+    async_project_router,
+    async_user_router,
+    metrics_router,
+)
+from config.config import settings
 from sqlmodel import Session, text
 from core.db import get_session, create_db_and_tables
+from core.compression import CompressionMiddleware
+from core.jobs import job_queue
+from core.tracing import TracedJSONResponse, TracedORJSONResponse, TracingMiddleware
 from contextlib import asynccontextmanager
-import uvicorn
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_db_and_tables()
+    if settings.DB_CREATE_TABLES:
+        create_db_and_tables()
+    await job_queue.start()
     yield
+    await job_queue.stop(settings.JOB_DRAIN_TIMEOUT)
 
-app = FastAPI(title="FastAPI JWT RBAC API", lifespan=lifespan)
+app = FastAPI(
+    title="FastAPI JWT RBAC API",
+    lifespan=lifespan,
+    default_response_class=TracedORJSONResponse if settings.FAST_JSON else TracedJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -23,9 +41,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the recorded duration covers the whole stack
+app.add_middleware(TracingMiddleware)
+
 # Include routers
-app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
-app.include_router(project_router, prefix="/api/v1/project", tags=["Projects"])
+if settings.DB_ASYNC:
+    app.include_router(async_auth_router, prefix="/api/v1/auth", tags=["Authentication"])
+    app.include_router(async_project_router, prefix="/api/v1/project", tags=["Projects"])
+    app.include_router(async_user_router, prefix="/api/v1/user", tags=["Users"])
+else:
+    app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
+    app.include_router(project_router, prefix="/api/v1/project", tags=["Projects"])
+    app.include_router(user_router, prefix="/api/v1/user", tags=["Users"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
 @app.get("/")
 def read_root():
@@ -46,4 +77,6 @@ def test_db(session: Session = Depends(get_session)):
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
     
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
@@ -1,2 +1,4 @@
 from models.user import User, UserRole
-from models.project import Project
\ No newline at end of file
+from models.project import Project
+from models.refresh_token import RefreshToken
+from models.background_job import BackgroundJob
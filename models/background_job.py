@@ -0,0 +1,13 @@
+from sqlmodel import Field, SQLModel
+from typing import Optional
+from datetime import datetime
+
+class BackgroundJob(SQLModel, table=True):
+    """A deferred job kept until its handler commits, when JOB_QUEUE_DURABLE is on."""
+
+    __tablename__ = "background_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str
+    payload: str  # JSON
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -1,4 +1,5 @@
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index, func, literal_column
 from typing import Optional
 from datetime import datetime
 
@@ -7,9 +8,42 @@ class ProjectBase(SQLModel):
     name: str
     description: Optional[str] = None
 
+# With PROJECT_PARTITIONS set, migration 0006_project_partitions rebuilds
+# this table on Postgres hash-partitioned by owner_id, with primary key
+# (id, owner_id). Queries filtering on owner_id then read one partition.
 class Project(ProjectBase, table=True):
+    __table_args__ = (
+        # Keyset pages of one owner's projects; also serves owner_id lookups
+        Index("ix_project_owner_id_id", "owner_id", "id"),
+        # Prefix search. Postgres needs text_pattern_ops for LIKE 'abc%' to use
+        # an index under a non-C collation; elsewhere this is a plain index
+        # used by the range bounds of the name_prefix filter.
+        Index("ix_project_name", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     owner_id: int = Field(foreign_key="user.id")
-    created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+    updated_at: datetime = Field(default_factory=datetime.now, index=True)
     owner: "User" = Relationship(back_populates="projects")
+
+# Full-text search document: name weighted above description. Queries must
+# build the same expression for Postgres to use the GIN index on it, so it
+# holds literals rather than bound parameters.
+_SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+def project_search_vector(columns):
+    return func.setweight(func.to_tsvector(_SEARCH_CONFIG, columns.name), literal_column("'A'")).op("||")(
+        func.setweight(func.to_tsvector(_SEARCH_CONFIG, func.coalesce(columns.description, literal_column("''"))), literal_column("'B'"))
+    )
+
+def project_search_query(terms: str):
+    return func.to_tsquery(_SEARCH_CONFIG, terms)
+
+# Postgres only; other databases search through core.search's in-process index
+Index(
+    "ix_project_search",
+    project_search_vector(Project.__table__.c),
+    postgresql_using="gin",
+    _table=Project.__table__,
+).ddl_if(dialect="postgresql")
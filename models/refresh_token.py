@@ -0,0 +1,18 @@
+from sqlmodel import Field, SQLModel
+from typing import Optional
+from datetime import datetime
+
+class RefreshToken(SQLModel, table=True):
+    __tablename__ = "refresh_token"
+
+    # Tokens are "<id>.<secret>"; only an HMAC of the secret is stored
+    id: str = Field(primary_key=True)
+    token_hash: str
+    user_id: int = Field(foreign_key="user.id", index=True)
+    # Every token rotated from the same login shares a family; presenting a
+    # rotated-out token again revokes the whole family.
+    family_id: str = Field(index=True)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = None
+    replaced_by: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
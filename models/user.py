@@ -19,4 +19,6 @@ class User(UserBase, table=True):
     hashed_password: str
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    # Written by a background job after login, so it may lag by a moment
+    last_login_at: Optional[datetime] = None
     projects: List["Project"] = Relationship(back_populates="owner")
\ No newline at end of file
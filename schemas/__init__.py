@@ -1,2 +1,11 @@
-from schemas.user import UserCreate, UserLogin, UserResponse, Token
-from schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
\ No newline at end of file
+from schemas.user import UserCreate, UserLogin, UserResponse, Token, RefreshRequest
+from schemas.project import (
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectResponse,
+    ProjectCount,
+    ProjectBatchUpdate,
+    ProjectBatchRequest,
+    ProjectBatchResult,
+    ProjectBatchResponse,
+)
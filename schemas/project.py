@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ProjectCreate(BaseModel):
@@ -17,3 +17,25 @@ class ProjectResponse(BaseModel):
     owner_id: int
     created_at: datetime
     updated_at: datetime
+
+class ProjectCount(BaseModel):
+    count: int
+
+class ProjectBatchUpdate(ProjectUpdate):
+    id: int
+
+class ProjectBatchRequest(BaseModel):
+    create: List[ProjectCreate] = []
+    update: List[ProjectBatchUpdate] = []
+    delete: List[int] = []
+
+class ProjectBatchResult(BaseModel):
+    action: str  # "create", "update" or "delete"
+    index: int  # position of the item in its request list
+    status_code: int
+    id: Optional[int] = None
+    project: Optional[ProjectResponse] = None
+    detail: Optional[str] = None
+
+class ProjectBatchResponse(BaseModel):
+    results: List[ProjectBatchResult]
@@ -0,0 +1,58 @@
+"""
+Production entry point: runs main:app on several uvicorn worker processes.
+
+    python serve.py
+
+Every worker imports the app and runs its lifespan, so the schema is
+migrated here once, before the workers start, and table creation is
+switched off for them. With DB_CREATE_TABLES=false nothing touches the
+schema at startup; run `python -m core.migrations` as a deploy step.
+"""
+from config.config import settings
+from core.migrations import run_migrations
+from typing import Any, Dict
+import os
+import uvicorn
+
+def server_options() -> Dict[str, Any]:
+    """uvicorn.run keyword arguments from the SERVER_* settings."""
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": settings.SERVER_WORKERS,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+    }
+
+def check_settings() -> None:
+    """Refuse settings that only hold within a single worker process."""
+    if (
+        settings.DATABASE_REPLICA_URLS
+        and settings.SERVER_WORKERS > 1
+        and settings.READ_YOUR_WRITES_BACKEND == "memory"
+    ):
+        # A user's next request may land on a worker that never saw their write
+        raise SystemExit(
+            "Read replicas with several workers need READ_YOUR_WRITES_BACKEND=redis "
+            "(or \"none\" to read from replicas right after writes)"
+        )
+
+def main() -> None:
+    check_settings()
+    if settings.DB_CREATE_TABLES:
+        run_migrations()
+    # Workers are fresh processes that read their settings from the environment;
+    # a single worker serves in this process, whose settings are already loaded
+    os.environ["DB_CREATE_TABLES"] = "false"
+    settings.DB_CREATE_TABLES = False
+    # Multiple workers need the app as an import string
+    uvicorn.run("main:app", **server_options())
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from services.auth import AuthService
-from services.user import UserService
-from services.project import ProjectService
\ No newline at end of file
+from services.auth import AuthService, AsyncAuthService
+from services.user import UserService, AsyncUserService
+from services.project import ProjectService, AsyncProjectService
@@ -1,11 +1,27 @@
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from core.db import get_session
-from models.user import User
-from core.security import get_password_hash, verify_password, create_access_token
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.db import get_session, get_async_session
+from core.jobs import job_queue
+from core.exceptions import ServiceUnavailableException
+from models.user import User, UserRole
+from models.refresh_token import RefreshToken
+from core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+    create_access_token,
+    create_refresh_token,
+    password_needs_update,
+    parse_refresh_token,
+    refresh_secret_matches,
+)
 from schemas.user import UserCreate, UserLogin, UserResponse, Token
-from typing import Optional
-from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
 from config.config import settings
 
 class AuthService:
@@ -13,30 +29,19 @@ class AuthService:
         self.session = session
 
     def register_user(self, user_data: UserCreate) -> User:
-        # Check if username already exists
-        user_exists = self.session.exec(
-            select(User).where(User.username == user_data.username)
-        ).first()
-        
-        if user_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered",
-            )
-        
-        # Create new user
-        hashed_password = get_password_hash(user_data.password)
-        user = User(
-            username=user_data.username,
-            email=user_data.email,
-            full_name=user_data.full_name,
-            role=user_data.role,
-            hashed_password=hashed_password,
-        )
-        
-        self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
+        # Create new user; the unique constraints reject duplicates
+        statement = _insert_user(user_data, get_password_hash(user_data.password))
+        try:
+            user = self.session.exec(statement).scalars().one()
+            # Detach so commit does not expire the row RETURNING just gave us
+            self.session.expunge(user)
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            username_taken = self.session.exec(
+                select(User.id).where(User.username == user_data.username)
+            ).first()
+            raise _duplicate_user(username_taken is not None)
         
         return user
 
@@ -45,39 +50,288 @@ class AuthService:
             select(User).where(User.username == user_data.username)
         ).first()
         
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        if not user or not verify_password(user_data.password, user.hashed_password):
+            raise _invalid_credentials()
         
-        if not verify_password(user_data.password, user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Create access token
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
-        )
-        
-        # Convert User model to UserResponse
-        user_response = UserResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role,
-            is_active=user.is_active,
-            created_at=user.created_at,
-        )
-        
-        return Token(
-            access_token=access_token,
-            token_type="bearer",
-            user=user_response,
+        refresh_token, _, statement = _issue_refresh_token(user.id)
+        self.session.exec(statement)
+        # Build the response and job payloads before commit expires the user
+        token = _token_for(user, refresh_token)
+        last_login = _last_login(user)
+        rehash = _rehash(user, user_data.password) if _needs_rehash(user) else None
+        self.session.commit()
+
+        job_queue.defer("last_login", last_login)
+        if rehash is not None:
+            # Off the request, so this login pays for one hash only. Not
+            # durable: the payload holds the plain password.
+            job_queue.defer("rehash_password", rehash, durable=False)
+        return token
+
+    def refresh(self, refresh_token: str) -> Token:
+        """Exchange a refresh token for new access and refresh tokens, without bcrypt."""
+        token_id, secret = _parse_refresh_token(refresh_token)
+        row = self.session.exec(_refresh_token_query(token_id)).first()
+        stored, user = _check_refresh_token(row, secret)
+        if stored.revoked_at is not None:
+            # A rotated-out token came back: assume it leaked and end the session
+            self.session.exec(_revoke_family(stored.family_id))
+            self.session.commit()
+            raise _invalid_refresh_token()
+
+        new_token, new_id, statement = _issue_refresh_token(user.id, stored.family_id)
+        if self.session.exec(_rotate(stored.id, new_id)).rowcount != 1:
+            # Lost a race with a concurrent refresh of the same token
+            self.session.rollback()
+            raise _invalid_refresh_token()
+        self.session.exec(statement)
+        token = _token_for(user, new_token)
+        self.session.commit()
+        return token
+
+    def revoke_refresh_token(self, refresh_token: str) -> None:
+        """Log out: revoke the token and every token rotated from the same login."""
+        token_id, secret = _parse_refresh_token(refresh_token)
+        row = self.session.exec(_refresh_token_query(token_id)).first()
+        stored, _ = _check_refresh_token(row, secret, allow_revoked=True)
+        self.session.exec(_revoke_family(stored.family_id))
+        self.session.commit()
+
+class AsyncAuthService:
+    """AuthService on an AsyncSession; bcrypt runs on the password hashing pool."""
+
+    def __init__(self, session: AsyncSession = Depends(get_async_session)):
+        self.session = session
+
+    async def register_user(self, user_data: UserCreate) -> User:
+        hashed_password = await get_password_hash_async(user_data.password)
+        statement = _insert_user(user_data, hashed_password)
+        try:
+            user = (await self.session.exec(statement)).scalars().one()
+            self.session.expunge(user)
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            username_taken = (await self.session.exec(
+                select(User.id).where(User.username == user_data.username)
+            )).first()
+            raise _duplicate_user(username_taken is not None)
+
+        return user
+
+    async def authenticate_user(self, user_data: UserLogin) -> Optional[Token]:
+        result = await self.session.exec(
+            select(User).where(User.username == user_data.username)
         )
+        user = result.first()
+
+        if not user or not await verify_password_async(user_data.password, user.hashed_password):
+            raise _invalid_credentials()
+
+        refresh_token, _, statement = _issue_refresh_token(user.id)
+        await self.session.exec(statement)
+        token = _token_for(user, refresh_token)
+        last_login = _last_login(user)
+        rehash = _rehash(user, user_data.password) if _needs_rehash(user) else None
+        await self.session.commit()
+
+        await job_queue.defer_async("last_login", last_login)
+        if rehash is not None:
+            await job_queue.defer_async("rehash_password", rehash, durable=False)
+        return token
+
+    async def refresh(self, refresh_token: str) -> Token:
+        """Exchange a refresh token for new access and refresh tokens, without bcrypt."""
+        token_id, secret = _parse_refresh_token(refresh_token)
+        row = (await self.session.exec(_refresh_token_query(token_id))).first()
+        stored, user = _check_refresh_token(row, secret)
+        if stored.revoked_at is not None:
+            await self.session.exec(_revoke_family(stored.family_id))
+            await self.session.commit()
+            raise _invalid_refresh_token()
+
+        new_token, new_id, statement = _issue_refresh_token(user.id, stored.family_id)
+        if (await self.session.exec(_rotate(stored.id, new_id))).rowcount != 1:
+            await self.session.rollback()
+            raise _invalid_refresh_token()
+        await self.session.exec(statement)
+        token = _token_for(user, new_token)
+        await self.session.commit()
+        return token
+
+    async def revoke_refresh_token(self, refresh_token: str) -> None:
+        """Log out: revoke the token and every token rotated from the same login."""
+        token_id, secret = _parse_refresh_token(refresh_token)
+        row = (await self.session.exec(_refresh_token_query(token_id))).first()
+        stored, _ = _check_refresh_token(row, secret, allow_revoked=True)
+        await self.session.exec(_revoke_family(stored.family_id))
+        await self.session.commit()
+
+def _insert_user(user_data: UserCreate, hashed_password: str):
+    # INSERT ... RETURNING: one statement instead of check, insert and refresh
+    now = datetime.now()
+    return insert(User).values(
+        username=user_data.username,
+        email=user_data.email,
+        full_name=user_data.full_name,
+        role=user_data.role or UserRole.USER,
+        is_active=True,
+        hashed_password=hashed_password,
+        created_at=now,
+        updated_at=now,
+    ).returning(User)
+
+def _needs_rehash(user: User) -> bool:
+    return settings.PASSWORD_REHASH_ON_LOGIN and password_needs_update(user.hashed_password)
+
+def _last_login(user: User) -> dict:
+    return {"user_id": user.id, "at": datetime.now().isoformat()}
+
+def _rehash(user: User, password: str) -> dict:
+    return {"user_id": user.id, "password": password, "old_hash": user.hashed_password}
+
+def record_last_logins(session: Session, payloads: List[dict]) -> None:
+    """Job handler: one executemany UPDATE for a batch of logins, latest per user."""
+    latest: Dict[int, str] = {}
+    for payload in payloads:
+        latest[payload["user_id"]] = max(payload["at"], latest.get(payload["user_id"], ""))
+    session.exec(
+        _LAST_LOGIN_UPDATE,
+        params=[{"target_id": user_id, "at": datetime.fromisoformat(at)} for user_id, at in latest.items()],
+    )
+
+def rehash_passwords(session: Session, payloads: List[dict]) -> None:
+    """Job handler: store passwords under the current hashing policy."""
+    for payload in payloads:
+        try:
+            new_hash = get_password_hash(payload["password"])
+        except ServiceUnavailableException:
+            # Hashing pool is saturated; the next login tries again
+            continue
+        session.exec(_update_password_hash(payload["user_id"], payload["old_hash"], new_hash))
+
+_user_table = User.__table__
+_LAST_LOGIN_UPDATE = (
+    update(_user_table)
+    .where(_user_table.c.id == bindparam("target_id"))
+    .values(last_login_at=bindparam("at", type_=_user_table.c.last_login_at.type))
+)
+
+job_queue.register("last_login", record_last_logins)
+# One bcrypt hash per payload: one per transaction, so no batch holds row
+# locks across several hashes or rehashes its successes on a retry
+job_queue.register("rehash_password", rehash_passwords, batch_size=1)
+
+def _update_password_hash(user_id: int, old_hash: str, new_hash: str):
+    # Matching the old hash keeps a concurrent password change from being overwritten
+    return (
+        update(User)
+        .where(User.id == user_id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+
+def _duplicate_user(username_taken: bool) -> HTTPException:
+    # Only the failure path looks up which unique constraint was hit
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Username already registered" if username_taken else "Email already registered",
+    )
+
+def _invalid_credentials() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect username or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _issue_refresh_token(user_id: int, family_id: Optional[str] = None):
+    """A new refresh token, its id, and the INSERT that stores it."""
+    token, token_id, token_hash = create_refresh_token()
+    now = datetime.now()
+    statement = insert(RefreshToken).values(
+        id=token_id,
+        token_hash=token_hash,
+        user_id=user_id,
+        family_id=family_id or token_id,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        created_at=now,
+    )
+    return token, token_id, statement
+
+def _parse_refresh_token(refresh_token: str) -> Tuple[str, str]:
+    parsed = parse_refresh_token(refresh_token)
+    if parsed is None:
+        raise _invalid_refresh_token()
+    return parsed
+
+def _refresh_token_query(token_id: str):
+    # The stored token and its user in one round trip; claims need the user's current role
+    return select(RefreshToken, User).join(User, User.id == RefreshToken.user_id).where(RefreshToken.id == token_id)
+
+def _check_refresh_token(row, secret: str, allow_revoked: bool = False) -> Tuple[RefreshToken, User]:
+    """Reject unknown, forged, expired (and unless allow_revoked, revoked) tokens and inactive users."""
+    if row is None:
+        raise _invalid_refresh_token()
+    stored, user = row
+    if not refresh_secret_matches(secret, stored.token_hash):
+        raise _invalid_refresh_token()
+    if allow_revoked:
+        return stored, user
+    # Revoked tokens are passed through so the caller can detect reuse
+    if stored.revoked_at is None and (stored.expires_at <= datetime.now() or not user.is_active):
+        raise _invalid_refresh_token()
+    return stored, user
+
+def _rotate(token_id: str, replaced_by: str):
+    # Conditional on revoked_at, so of two concurrent refreshes only one wins
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.id == token_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(), replaced_by=replaced_by)
+    )
+
+def _revoke_family(family_id: str):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now())
+    )
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _token_for(user: User, refresh_token: Optional[str] = None) -> Token:
+    # Create access token
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # role and is_active let stateless authentication skip the user lookup
+    access_token = create_access_token(
+        data={
+            "sub": str(user.id),
+            "username": user.username,
+            "role": user.role,
+            "is_active": user.is_active,
+        },
+        expires_delta=access_token_expires,
+    )
+    
+    # Convert User model to UserResponse
+    user_response = UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        created_at=user.created_at,
+    )
+    
+    return Token(
+        access_token=access_token,
+        token_type="bearer",
+        user=user_response,
+        refresh_token=refresh_token,
+    )
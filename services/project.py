@@ -1,117 +1,840 @@
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import and_, bindparam, delete, func, insert, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
 from sqlmodel import Session, select
-from core.db import get_session
-from models.project import Project
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.db import get_session, get_async_session
+from core.dependencies import get_read_session, get_read_session_async
+from core.replicas import record_write, record_write_async
+from core.cache import build_cache_backend
+from core.search import project_search_index, search_terms, tsquery
+from core.snapshot import SnapshotPage, project_snapshot
+from models.project import Project, project_search_query, project_search_vector
 from models.user import User
-from schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
-from typing import List
+from schemas.project import (
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectResponse,
+    ProjectBatchRequest,
+    ProjectBatchResult,
+    ProjectBatchResponse,
+    ProjectBatchUpdate,
+    ProjectCount,
+)
+from config.config import settings
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import orjson
+import sys
+
+# Read-through cache of serialized ProjectResponse documents keyed by id;
+# every write path below keeps it current.
+project_cache = build_cache_backend(
+    settings.PROJECT_CACHE_BACKEND,
+    maxsize=settings.PROJECT_CACHE_SIZE,
+    ttl=settings.PROJECT_CACHE_TTL,
+)
 
 class ProjectService:
-    def __init__(self, session: Session = Depends(get_session)):
+    def __init__(self, session: Session = Depends(get_session), read_session: Session = Depends(get_read_session)):
         self.session = session
+        # A replica when configured; reads after the user's own writes stay on the primary
+        self.read_session = read_session
 
     def create_project(self, project_data: ProjectCreate, current_user: User) -> ProjectResponse:
-        project = Project(
-            name=project_data.name,
-            description=project_data.description,
-            owner_id=current_user.id,
-        )
-        
-        self.session.add(project)
+        project = self.session.exec(_insert_project(project_data, current_user)).scalars().one()
+        # Build the response before commit expires the returned row
+        response = _to_response(project)
+        record_write(current_user.id)
         self.session.commit()
-        self.session.refresh(project)
         
-        return ProjectResponse(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            owner_id=project.owner_id,
-            created_at=project.created_at,
-            updated_at=project.updated_at,
-        )
+        _cache_project(response)
+        _publish_project(response)
+        return response
+
+    def get_projects(
+        self,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> List[ProjectResponse]:
+        statement = _projects_query(after_id, owner_id, name_prefix, updated_since).limit(limit)
+        projects = self.read_session.exec(statement).all()
+        return [_to_response(project) for project in projects]
+
+    def get_project_rows(
+        self,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """get_projects as plain dicts, for encoding without building models."""
+        statement = _projects_query(after_id, owner_id, name_prefix, updated_since, columns=True).limit(limit)
+        return [row._asdict() for row in self.read_session.exec(statement)]
+
+    def count_projects(self, owner_id: Optional[int] = None) -> ProjectCount:
+        return ProjectCount(count=self.read_session.exec(_count_query(owner_id)).one())
+
+    def get_projects_version(
+        self,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> Tuple[int, Optional[datetime]]:
+        """Count and newest updated_at of the projects get_projects would page through."""
+        count, newest = self.read_session.exec(_version_query(owner_id, name_prefix, updated_since)).one()
+        return count, newest
+
+    def get_snapshot_version(self) -> Tuple[int, Optional[datetime]]:
+        """get_projects_version of the snapshot that get_snapshot_page serves."""
+        self._refresh_snapshot()
+        return project_snapshot.version()
+
+    def get_snapshot_page(self, limit: int = settings.PROJECTS_PAGE_SIZE, after_id: Optional[int] = None) -> SnapshotPage:
+        """An unfiltered get_projects page, serialized, from the in-process snapshot."""
+        self._refresh_snapshot()
+        return project_snapshot.page(limit, after_id)
+
+    def _refresh_snapshot(self) -> None:
+        # The second pass only runs when the row counts disagree, as a full reload
+        for _ in range(2):
+            refresh = project_snapshot.begin_refresh()
+            if refresh is None:
+                break
+            try:
+                rows = [row._asdict() for row in self.read_session.exec(_snapshot_query(refresh.since))]
+                total = self.read_session.exec(_count_query(None)).one()
+            except Exception:
+                project_snapshot.abort_refresh()
+                raise
+            if project_snapshot.apply(refresh, rows, total):
+                break
+
+    def search_projects(self, query: str, limit: int = settings.PROJECTS_PAGE_SIZE, offset: int = 0) -> List[ProjectResponse]:
+        """Projects whose name or description match query, best match first."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if _full_text_search(self.read_session.get_bind()):
+            projects = self.read_session.exec(_search_query(terms, limit, offset)).all()
+            return [_to_response(project) for project in projects]
+
+        if not project_search_index.loaded:
+            project_search_index.begin_load()
+            try:
+                documents = self.read_session.exec(_SEARCH_DOCUMENTS).all()
+            except Exception:
+                project_search_index.abort_load()
+                raise
+            project_search_index.finish_load(documents)
+        ids = project_search_index.search(terms, limit, offset)
+        if not ids:
+            return []
+        projects = self.read_session.exec(select(Project).where(Project.id.in_(ids))).all()
+        return _in_rank_order(projects, ids)
+
+    def stream_projects(
+        self,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """Yield matching projects as NDJSON lines read through a server-side cursor."""
+        fast = settings.FAST_JSON
+        statement = _stream_query(limit, after_id, owner_id, name_prefix, updated_since, columns=fast)
+        encode = _row_to_ndjson if fast else _to_ndjson
+        # The request-scoped session is closed before the response body is sent,
+        # so the generator opens its own session on the same engine.
+        bind = self.read_session.get_bind()
+
+        def rows() -> Iterator[bytes]:
+            with Session(bind) as session:
+                for project in session.exec(statement):
+                    yield encode(project)
 
-    def get_projects(self) -> List[ProjectResponse]:
-        projects = self.session.exec(select(Project)).all()
-        return [
-            ProjectResponse(
-                id=project.id,
-                name=project.name,
-                description=project.description,
-                owner_id=project.owner_id,
-                created_at=project.created_at,
-                updated_at=project.updated_at,
-            )
-            for project in projects
-        ]
+        return rows()
 
     def get_project_by_id(self, project_id: int) -> ProjectResponse:
-        project = self.session.exec(select(Project).where(Project.id == project_id)).first()
+        cached = _cached_project(project_id)
+        if cached is not None:
+            return cached
+
+        project = self.read_session.exec(select(Project).where(Project.id == project_id)).first()
         if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Project with ID {project_id} not found",
-            )
+            raise _project_not_found(project_id)
         
-        return ProjectResponse(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            owner_id=project.owner_id,
-            created_at=project.created_at,
-            updated_at=project.updated_at,
-        )
+        response = _to_response(project)
+        # Replica rows may lag the primary; only primary reads fill the cache
+        if self.read_session is self.session:
+            _fill_project_cache(response)
+        return response
 
     def update_project(self, project_id: int, project_data: ProjectUpdate, current_user: User) -> ProjectResponse:
-        project = self.session.exec(select(Project).where(Project.id == project_id)).first()
+        project = self.session.exec(_update_project(project_id, project_data, current_user)).scalars().first()
         if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Project with ID {project_id} not found",
-            )
-        
-        # Check if user is admin or is the owner of the project
-        if current_user.role != "admin" and project.owner_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to update this project",
-            )
-        
-        # Update project fields
-        if project_data.name is not None:
-            project.name = project_data.name
-        if project_data.description is not None:
-            project.description = project_data.description
-        
-        project.updated_at = datetime.utcnow()
-        
-        self.session.add(project)
+            exists = self.session.exec(select(Project.id).where(Project.id == project_id)).first()
+            raise _write_failed(project_id, exists is not None, "update")
+        response = _to_response(project)
+        record_write(current_user.id)
         self.session.commit()
-        self.session.refresh(project)
         
-        return ProjectResponse(
-            id=project.id,
-            name=project.name,
-            description=project.description,
-            owner_id=project.owner_id,
-            created_at=project.created_at,
-            updated_at=project.updated_at,
-        )
+        _cache_project(response)
+        _publish_project(response)
+        return response
 
     def delete_project(self, project_id: int, current_user: User) -> None:
-        project = self.session.exec(select(Project).where(Project.id == project_id)).first()
+        deleted = self.session.exec(_delete_project(project_id, current_user)).first()
+        if not deleted:
+            exists = self.session.exec(select(Project.id).where(Project.id == project_id)).first()
+            raise _write_failed(project_id, exists is not None, "delete")
+        record_write(current_user.id)
+        self.session.commit()
+        _evict_project(project_id)
+        _withdraw_project(project_id)
+
+    def batch(self, batch: ProjectBatchRequest, current_user: User) -> ProjectBatchResponse:
+        """Apply creates, updates and deletes in one transaction, reporting per item."""
+        _check_batch_size(batch)
+        results: List[ProjectBatchResult] = []
+        is_admin = current_user.role == "admin"
+
+        if batch.create:
+            if is_admin:
+                created = self.session.exec(
+                    _BATCH_INSERT, params=_create_values(batch.create, current_user)
+                ).scalars().all()
+                results += _created_results(created)
+            else:
+                results += _forbidden_results("create", len(batch.create))
+
+        if batch.update:
+            ids = [item.id for item in batch.update]
+            owners = dict(self.session.exec(
+                select(Project.id, Project.owner_id).where(Project.id.in_(ids))
+            ).all())
+            allowed, failures = _plan_updates(batch.update, owners, current_user)
+            results += failures
+            if allowed:
+                self.session.exec(_BATCH_UPDATE, params=[values for _, values in allowed])
+                updated = self.session.exec(_updated_query(allowed)).all()
+                results += _updated_results(allowed, updated)
+
+        if batch.delete:
+            if is_admin:
+                deleted = self.session.exec(
+                    delete(Project).where(Project.id.in_(batch.delete)).returning(Project.id)
+                ).scalars().all()
+                results += _deleted_results(batch.delete, deleted)
+            else:
+                results += _forbidden_results("delete", len(batch.delete))
+
+        record_write(current_user.id)
+        self.session.commit()
+        _sync_batch_writes(results)
+        return ProjectBatchResponse(results=results)
+
+class AsyncProjectService:
+    def __init__(
+        self,
+        session: AsyncSession = Depends(get_async_session),
+        read_session: AsyncSession = Depends(get_read_session_async),
+    ):
+        self.session = session
+        self.read_session = read_session
+
+    async def create_project(self, project_data: ProjectCreate, current_user: User) -> ProjectResponse:
+        project = (await self.session.exec(_insert_project(project_data, current_user))).scalars().one()
+        response = _to_response(project)
+        await record_write_async(current_user.id)
+        await self.session.commit()
+
+        await _run_cache_call(_cache_project, response)
+        _publish_project(response)
+        return response
+
+    async def get_projects(
+        self,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> List[ProjectResponse]:
+        statement = _projects_query(after_id, owner_id, name_prefix, updated_since).limit(limit)
+        projects = (await self.read_session.exec(statement)).all()
+        return [_to_response(project) for project in projects]
+
+    async def get_project_rows(
+        self,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """get_projects as plain dicts, for encoding without building models."""
+        statement = _projects_query(after_id, owner_id, name_prefix, updated_since, columns=True).limit(limit)
+        return [row._asdict() for row in await self.read_session.exec(statement)]
+
+    async def count_projects(self, owner_id: Optional[int] = None) -> ProjectCount:
+        return ProjectCount(count=(await self.read_session.exec(_count_query(owner_id))).one())
+
+    async def get_projects_version(
+        self,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> Tuple[int, Optional[datetime]]:
+        """Count and newest updated_at of the projects get_projects would page through."""
+        count, newest = (await self.read_session.exec(_version_query(owner_id, name_prefix, updated_since))).one()
+        return count, newest
+
+    async def get_snapshot_version(self) -> Tuple[int, Optional[datetime]]:
+        """get_projects_version of the snapshot that get_snapshot_page serves."""
+        await self._refresh_snapshot()
+        return project_snapshot.version()
+
+    async def get_snapshot_page(self, limit: int = settings.PROJECTS_PAGE_SIZE, after_id: Optional[int] = None) -> SnapshotPage:
+        """An unfiltered get_projects page, serialized, from the in-process snapshot."""
+        await self._refresh_snapshot()
+        return project_snapshot.page(limit, after_id)
+
+    async def _refresh_snapshot(self) -> None:
+        # The second pass only runs when the row counts disagree, as a full reload
+        for _ in range(2):
+            refresh = project_snapshot.begin_refresh()
+            if refresh is None:
+                break
+            try:
+                rows = [row._asdict() for row in await self.read_session.exec(_snapshot_query(refresh.since))]
+                total = (await self.read_session.exec(_count_query(None))).one()
+            except Exception:
+                project_snapshot.abort_refresh()
+                raise
+            if refresh.since is None:
+                # Serializing a whole table takes a while; keep it off the event loop
+                applied = await asyncio.to_thread(project_snapshot.apply, refresh, rows, total)
+            else:
+                applied = project_snapshot.apply(refresh, rows, total)
+            if applied:
+                break
+
+    async def search_projects(self, query: str, limit: int = settings.PROJECTS_PAGE_SIZE, offset: int = 0) -> List[ProjectResponse]:
+        """Projects whose name or description match query, best match first."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        if _full_text_search(self.read_session.bind):
+            projects = (await self.read_session.exec(_search_query(terms, limit, offset))).all()
+            return [_to_response(project) for project in projects]
+
+        if not project_search_index.loaded:
+            project_search_index.begin_load()
+            try:
+                documents = (await self.read_session.exec(_SEARCH_DOCUMENTS)).all()
+            except Exception:
+                project_search_index.abort_load()
+                raise
+            # Indexing a large table takes a while; keep it off the event loop
+            await asyncio.to_thread(project_search_index.finish_load, documents)
+        ids = project_search_index.search(terms, limit, offset)
+        if not ids:
+            return []
+        projects = (await self.read_session.exec(select(Project).where(Project.id.in_(ids)))).all()
+        return _in_rank_order(projects, ids)
+
+    def stream_projects(
+        self,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield matching projects as NDJSON lines read through a server-side cursor."""
+        fast = settings.FAST_JSON
+        statement = _stream_query(limit, after_id, owner_id, name_prefix, updated_since, columns=fast)
+        bind = self.read_session.bind
+
+        async def rows() -> AsyncIterator[bytes]:
+            async with AsyncSession(bind) as session:
+                result = await session.stream(statement)
+                if fast:
+                    async for row in result:
+                        yield _row_to_ndjson(row)
+                else:
+                    async for project in result.scalars():
+                        yield _to_ndjson(project)
+
+        return rows()
+
+    async def get_project_by_id(self, project_id: int) -> ProjectResponse:
+        cached = await _run_cache_call(_cached_project, project_id)
+        if cached is not None:
+            return cached
+
+        project = (await self.read_session.exec(select(Project).where(Project.id == project_id))).first()
         if not project:
-            raise HTTPException(
+            raise _project_not_found(project_id)
+
+        response = _to_response(project)
+        if self.read_session is self.session:
+            await _run_cache_call(_fill_project_cache, response)
+        return response
+
+    async def update_project(self, project_id: int, project_data: ProjectUpdate, current_user: User) -> ProjectResponse:
+        project = (await self.session.exec(_update_project(project_id, project_data, current_user))).scalars().first()
+        if not project:
+            exists = (await self.session.exec(select(Project.id).where(Project.id == project_id))).first()
+            raise _write_failed(project_id, exists is not None, "update")
+        response = _to_response(project)
+        await record_write_async(current_user.id)
+        await self.session.commit()
+
+        await _run_cache_call(_cache_project, response)
+        _publish_project(response)
+        return response
+
+    async def delete_project(self, project_id: int, current_user: User) -> None:
+        deleted = (await self.session.exec(_delete_project(project_id, current_user))).first()
+        if not deleted:
+            exists = (await self.session.exec(select(Project.id).where(Project.id == project_id))).first()
+            raise _write_failed(project_id, exists is not None, "delete")
+        await record_write_async(current_user.id)
+        await self.session.commit()
+        await _run_cache_call(_evict_project, project_id)
+        _withdraw_project(project_id)
+
+    async def batch(self, batch: ProjectBatchRequest, current_user: User) -> ProjectBatchResponse:
+        """Apply creates, updates and deletes in one transaction, reporting per item."""
+        _check_batch_size(batch)
+        results: List[ProjectBatchResult] = []
+        is_admin = current_user.role == "admin"
+
+        if batch.create:
+            if is_admin:
+                created = (await self.session.exec(
+                    _BATCH_INSERT, params=_create_values(batch.create, current_user)
+                )).scalars().all()
+                results += _created_results(created)
+            else:
+                results += _forbidden_results("create", len(batch.create))
+
+        if batch.update:
+            ids = [item.id for item in batch.update]
+            owners = dict((await self.session.exec(
+                select(Project.id, Project.owner_id).where(Project.id.in_(ids))
+            )).all())
+            allowed, failures = _plan_updates(batch.update, owners, current_user)
+            results += failures
+            if allowed:
+                await self.session.exec(_BATCH_UPDATE, params=[values for _, values in allowed])
+                updated = (await self.session.exec(_updated_query(allowed))).all()
+                results += _updated_results(allowed, updated)
+
+        if batch.delete:
+            if is_admin:
+                deleted = (await self.session.exec(
+                    delete(Project).where(Project.id.in_(batch.delete)).returning(Project.id)
+                )).scalars().all()
+                results += _deleted_results(batch.delete, deleted)
+            else:
+                results += _forbidden_results("delete", len(batch.delete))
+
+        await record_write_async(current_user.id)
+        await self.session.commit()
+        await _run_cache_call(_sync_batch_writes, results)
+        return ProjectBatchResponse(results=results)
+
+def _insert_project(project_data: ProjectCreate, current_user: User):
+    # INSERT ... RETURNING replaces add / commit / refresh
+    now = datetime.now()
+    return insert(Project).values(
+        name=project_data.name,
+        description=project_data.description,
+        owner_id=current_user.id,
+        created_at=now,
+        updated_at=now,
+    ).returning(Project)
+
+def _update_project(project_id: int, project_data: ProjectUpdate, current_user: User):
+    # Update project fields
+    values = {"updated_at": datetime.now()}
+    if project_data.name is not None:
+        values["name"] = project_data.name
+    if project_data.description is not None:
+        values["description"] = project_data.description
+    
+    statement = update(Project).where(Project.id == project_id)
+    return _owned_by(statement, current_user).values(**values).returning(Project)
+
+def _delete_project(project_id: int, current_user: User):
+    statement = delete(Project).where(Project.id == project_id)
+    return _owned_by(statement, current_user).returning(Project.owner_id)
+
+def _owned_by(statement, current_user: User):
+    # Admins may modify any project, everyone else only their own; folding
+    # the check into the WHERE clause avoids reading the row first.
+    if current_user.role != "admin":
+        statement = statement.where(Project.owner_id == current_user.id)
+    return statement
+
+def _write_failed(project_id: int, exists: bool, action: str) -> HTTPException:
+    """404 or 403 for a write that matched no row; only failures pay for the extra lookup."""
+    if not exists:
+        return _project_not_found(project_id)
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Not enough permissions to {action} this project",
+    )
+
+def _project_not_found(project_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Project with ID {project_id} not found",
+    )
+
+# Multi-row INSERT ... RETURNING, batched by SQLAlchemy's insertmanyvalues
+_BATCH_INSERT = insert(Project).returning(Project, sort_by_parameter_order=True)
+
+# One executemany UPDATE; fields left out of an item keep their value. The
+# owner, already looked up for the permission check, lets a table partitioned
+# by owner_id prune each row's update to one partition.
+_project_table = Project.__table__
+_BATCH_UPDATE = (
+    update(_project_table)
+    .where(_project_table.c.id == bindparam("target_id"))
+    .where(_project_table.c.owner_id == bindparam("target_owner_id"))
+    .values(
+        name=func.coalesce(bindparam("new_name", type_=_project_table.c.name.type), _project_table.c.name),
+        description=func.coalesce(
+            bindparam("new_description", type_=_project_table.c.description.type),
+            _project_table.c.description,
+        ),
+        updated_at=bindparam("new_updated_at", type_=_project_table.c.updated_at.type),
+    )
+)
+
+def _check_batch_size(batch: ProjectBatchRequest) -> None:
+    size = len(batch.create) + len(batch.update) + len(batch.delete)
+    if size > settings.PROJECT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch of {size} items exceeds the limit of {settings.PROJECT_BATCH_MAX_SIZE}",
+        )
+
+def _create_values(items: List[ProjectCreate], current_user: User) -> List[Dict]:
+    now = datetime.now()
+    return [
+        {
+            "name": item.name,
+            "description": item.description,
+            "owner_id": current_user.id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+
+def _plan_updates(
+    items: List[ProjectBatchUpdate], owners: Dict[int, int], current_user: User
+) -> Tuple[List[Tuple[int, Dict]], List[ProjectBatchResult]]:
+    """Split update items into executemany parameters and per-item failures."""
+    now = datetime.now()
+    allowed: List[Tuple[int, Dict]] = []
+    failures: List[ProjectBatchResult] = []
+    for index, item in enumerate(items):
+        if item.id not in owners:
+            failures.append(ProjectBatchResult(
+                action="update", index=index, id=item.id,
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Project with ID {project_id} not found",
-            )
-        
-        # Check if user is admin or is the owner of the project
-        if current_user.role != "admin" and project.owner_id != current_user.id:
-            raise HTTPException(
+                detail=f"Project with ID {item.id} not found",
+            ))
+        elif current_user.role != "admin" and owners[item.id] != current_user.id:
+            failures.append(ProjectBatchResult(
+                action="update", index=index, id=item.id,
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to delete this project",
-            )
-        
-        self.session.delete(project)
-        self.session.commit()
+                detail="Not enough permissions to update this project",
+            ))
+        else:
+            allowed.append((index, {
+                "target_id": item.id,
+                "target_owner_id": owners[item.id],
+                "new_name": item.name,
+                "new_description": item.description,
+                "new_updated_at": now,
+            }))
+    return allowed, failures
+
+def _updated_query(allowed: List[Tuple[int, Dict]]):
+    return (
+        select(Project)
+        .where(Project.id.in_([values["target_id"] for _, values in allowed]))
+        .where(Project.owner_id.in_(sorted({values["target_owner_id"] for _, values in allowed})))
+        .execution_options(populate_existing=True)
+    )
+
+def _created_results(created: List[Project]) -> List[ProjectBatchResult]:
+    return [
+        ProjectBatchResult(
+            action="create", index=index, id=project.id,
+            status_code=status.HTTP_201_CREATED, project=_to_response(project),
+        )
+        for index, project in enumerate(created)
+    ]
+
+def _updated_results(allowed: List[Tuple[int, Dict]], updated: List[Project]) -> List[ProjectBatchResult]:
+    by_id = {project.id: project for project in updated}
+    return [
+        ProjectBatchResult(
+            action="update", index=index, id=values["target_id"],
+            status_code=status.HTTP_200_OK, project=_to_response(by_id[values["target_id"]]),
+        )
+        for index, values in allowed
+    ]
+
+def _deleted_results(requested: List[int], deleted: List[int]) -> List[ProjectBatchResult]:
+    # Each deleted row answers one item; a repeated id finds nothing left to delete
+    unclaimed = set(deleted)
+    results: List[ProjectBatchResult] = []
+    for index, project_id in enumerate(requested):
+        if project_id in unclaimed:
+            unclaimed.discard(project_id)
+            results.append(ProjectBatchResult(
+                action="delete", index=index, id=project_id, status_code=status.HTTP_204_NO_CONTENT
+            ))
+        else:
+            results.append(ProjectBatchResult(
+                action="delete", index=index, id=project_id,
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Project with ID {project_id} not found",
+            ))
+    return results
+
+def _forbidden_results(action: str, count: int) -> List[ProjectBatchResult]:
+    return [
+        ProjectBatchResult(
+            action=action, index=index, status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not enough permissions to {action} this project",
+        )
+        for index in range(count)
+    ]
+
+def _sync_batch_writes(results: List[ProjectBatchResult]) -> None:
+    """Bring the cache, search index and snapshot up to date with a committed batch."""
+    for result in results:
+        if result.project is not None:
+            _cache_project(result.project)
+            _publish_project(result.project)
+        elif result.action == "delete" and result.status_code == status.HTTP_204_NO_CONTENT:
+            _evict_project(result.id)
+            _withdraw_project(result.id)
+
+# ProjectResponse fields, selected as plain columns by the fast JSON paths
+_PROJECT_COLUMNS = (
+    Project.id,
+    Project.name,
+    Project.description,
+    Project.owner_id,
+    Project.created_at,
+    Project.updated_at,
+)
+
+def _projects_query(
+    after_id: Optional[int],
+    owner_id: Optional[int],
+    name_prefix: Optional[str],
+    updated_since: Optional[datetime],
+    columns: bool = False,
+):
+    # Keyset pagination on the primary key: ids are assigned in creation
+    # order, so this is also a stable created_at ordering.
+    statement = select(*_PROJECT_COLUMNS) if columns else select(Project)
+    statement = statement.order_by(Project.id)
+    if after_id is not None:
+        statement = statement.where(Project.id > after_id)
+    return _filter_projects(statement, owner_id, name_prefix, updated_since)
+
+def _filter_projects(statement, owner_id: Optional[int], name_prefix: Optional[str], updated_since: Optional[datetime]):
+    if owner_id is not None:
+        statement = statement.where(Project.owner_id == owner_id)
+    if name_prefix:
+        statement = statement.where(_NamePrefix(name_prefix))
+    if updated_since is not None:
+        statement = statement.where(Project.updated_at >= updated_since)
+    return statement
+
+def _count_query(owner_id: Optional[int]):
+    # count(*) over the (owner_id, id) index; no table rows are read
+    statement = select(func.count()).select_from(Project)
+    if owner_id is not None:
+        statement = statement.where(Project.owner_id == owner_id)
+    return statement
+
+def _full_text_search(bind) -> bool:
+    # Postgres ranks with its GIN index; anything else uses the in-process index
+    return bind.dialect.name == "postgresql"
+
+def _search_query(terms: List[str], limit: int, offset: int):
+    vector = project_search_vector(Project)
+    query = project_search_query(tsquery(terms))
+    return (
+        select(Project)
+        .where(vector.op("@@")(query))
+        .order_by(func.ts_rank_cd(vector, query).desc(), Project.id)
+        .offset(offset)
+        .limit(limit)
+    )
+
+# What the in-process search index is loaded from
+_SEARCH_DOCUMENTS = select(Project.id, Project.name, Project.description).order_by(Project.id)
+
+def _in_rank_order(projects: List[Project], ids: List[int]) -> List[ProjectResponse]:
+    # Projects deleted since the index was updated drop out
+    by_id = {project.id: project for project in projects}
+    return [_to_response(by_id[project_id]) for project_id in ids if project_id in by_id]
+
+def _version_query(owner_id: Optional[int], name_prefix: Optional[str], updated_since: Optional[datetime]):
+    # Changes with every insert (count), delete (count) and update (updated_at);
+    # both aggregates are answered from indexes
+    statement = select(func.count(), func.max(Project.updated_at)).select_from(Project)
+    return _filter_projects(statement, owner_id, name_prefix, updated_since)
+
+def _snapshot_query(since: Optional[datetime]):
+    # Served by the updated_at index; since=None reads the whole table
+    statement = select(*_PROJECT_COLUMNS).order_by(Project.id)
+    if since is not None:
+        statement = statement.where(Project.updated_at >= since)
+    return statement
+
+class _NamePrefix(ColumnElement):
+    """
+    name LIKE 'prefix%'. Elsewhere than on Postgres it is ANDed with the
+    code point range of the prefix, so a plain index on name can serve it
+    (SQLite does not use one for LIKE). Postgres plans the LIKE on the
+    text_pattern_ops index itself, and there a range would compare under
+    the column's collation, whose order is not code point order, and drop
+    matches (a prefix ending in "z" would be bounded by "{").
+    """
+
+    inherit_cache = True
+    _traverse_internals = [
+        ("like", InternalTraversal.dp_clauseelement),
+        ("bounded", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, prefix: str):
+        self.like = Project.name.startswith(prefix, autoescape=True)
+        bounds = [Project.name >= prefix]
+        upper = _prefix_upper_bound(prefix)
+        if upper is not None:
+            bounds.append(Project.name < upper)
+        self.bounded = and_(*bounds, self.like)
+
+@compiles(_NamePrefix)
+def _compile_name_prefix(element, compiler, **kw):
+    return compiler.process(element.bounded, **kw)
+
+@compiles(_NamePrefix, "postgresql")
+def _compile_name_prefix_postgresql(element, compiler, **kw):
+    return compiler.process(element.like, **kw)
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with prefix, if any."""
+    following = ord(prefix[-1]) + 1
+    if following > sys.maxunicode:
+        return None
+    if 0xD800 <= following <= 0xDFFF:
+        # Surrogates cannot be encoded; the next real code point follows them
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+def _stream_query(
+    limit: Optional[int],
+    after_id: Optional[int],
+    owner_id: Optional[int],
+    name_prefix: Optional[str],
+    updated_since: Optional[datetime],
+    columns: bool = False,
+):
+    statement = _projects_query(after_id, owner_id, name_prefix, updated_since, columns)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement.execution_options(
+        stream_results=True, yield_per=settings.PROJECTS_STREAM_BATCH_SIZE
+    )
+
+def _to_response(project: Project) -> ProjectResponse:
+    return ProjectResponse(
+        id=project.id,
+        name=project.name,
+        description=project.description,
+        owner_id=project.owner_id,
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+    )
+
+# Left in place of a deleted project for PROJECT_CACHE_TTL, so a read that
+# fetched the row before the delete cannot fill it back
+_DELETED = b"deleted"
+
+def _cache_key(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def _cached_project(project_id: int) -> Optional[ProjectResponse]:
+    if project_cache is None:
+        return None
+    document = project_cache.get(_cache_key(project_id))
+    if document is None or document == _DELETED:
+        return None
+    return ProjectResponse.model_validate_json(document)
+
+def _cache_project(response: ProjectResponse) -> None:
+    if project_cache is not None:
+        project_cache.set(_cache_key(response.id), response.model_dump_json().encode())
+
+def _fill_project_cache(response: ProjectResponse) -> None:
+    # A read that raced an update or delete may hold the older row; never let
+    # it replace what the update wrote through or the delete left behind
+    if project_cache is None:
+        return
+    document = project_cache.get(_cache_key(response.id))
+    if document == _DELETED:
+        return
+    if document is None or ProjectResponse.model_validate_json(document).updated_at < response.updated_at:
+        _cache_project(response)
+
+def _evict_project(project_id: int) -> None:
+    if project_cache is not None:
+        project_cache.set(_cache_key(project_id), _DELETED)
+
+def _publish_project(response: ProjectResponse) -> None:
+    # In-process read structures: the search index and the listing snapshot
+    project_search_index.add(response.id, response.name, response.description)
+    project_snapshot.upsert(response.model_dump())
+
+def _withdraw_project(project_id: int) -> None:
+    project_search_index.remove(project_id)
+    project_snapshot.discard(project_id)
+
+async def _run_cache_call(fn, *args):
+    # Network-backed caches are called from a worker thread so they cannot
+    # stall the event loop; the in-process cache is called directly.
+    if project_cache is not None and project_cache.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+def _to_ndjson(project: Project) -> bytes:
+    return _to_response(project).model_dump_json().encode() + b"\n"
+
+def _row_to_ndjson(row) -> bytes:
+    return orjson.dumps(row._asdict()) + b"\n"
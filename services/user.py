@@ -1,43 +1,104 @@
 from fastapi import Depends, HTTPException, status
 from sqlmodel import Session, select
-from core.db import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.dependencies import get_read_session, get_read_session_async
 from models.user import User
 from schemas.user import UserResponse
-from typing import List
+from schemas.project import ProjectResponse, ProjectCount
+from services.project import _count_query, _projects_query, _to_response as _project_to_response
+from config.config import settings
+from typing import List, Optional
 
 class UserService:
-    def __init__(self, session: Session = Depends(get_session)):
+    # Read-only, so it runs on a replica when one is configured
+    def __init__(self, session: Session = Depends(get_read_session)):
         self.session = session
 
     def get_users(self) -> List[UserResponse]:
         users = self.session.exec(select(User)).all()
-        return [
-            UserResponse(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                full_name=user.full_name,
-                role=user.role,
-                is_active=user.is_active,
-                created_at=user.created_at,
-            )
-            for user in users
-        ]
+        return [_to_response(user) for user in users]
 
     def get_user_by_id(self, user_id: int) -> UserResponse:
         user = self.session.exec(select(User).where(User.id == user_id)).first()
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with ID {user_id} not found",
-            )
+            raise _user_not_found(user_id)
         
-        return UserResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            full_name=user.full_name,
-            role=user.role,
-            is_active=user.is_active,
-            created_at=user.created_at,
-        )
+        return _to_response(user)
+
+    def get_user_projects(
+        self,
+        user_id: int,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+    ) -> List[ProjectResponse]:
+        statement = _projects_query(after_id, user_id, None, None).limit(limit)
+        projects = self.session.exec(statement).all()
+        # An empty page may mean the user does not exist; only then look it up
+        if not projects and not self._user_exists(user_id):
+            raise _user_not_found(user_id)
+        return [_project_to_response(project) for project in projects]
+
+    def count_user_projects(self, user_id: int) -> ProjectCount:
+        count = self.session.exec(_count_query(user_id)).one()
+        if not count and not self._user_exists(user_id):
+            raise _user_not_found(user_id)
+        return ProjectCount(count=count)
+
+    def _user_exists(self, user_id: int) -> bool:
+        return self.session.exec(_user_id_query(user_id)).first() is not None
+
+class AsyncUserService:
+    def __init__(self, session: AsyncSession = Depends(get_read_session_async)):
+        self.session = session
+
+    async def get_users(self) -> List[UserResponse]:
+        users = (await self.session.exec(select(User))).all()
+        return [_to_response(user) for user in users]
+
+    async def get_user_by_id(self, user_id: int) -> UserResponse:
+        user = (await self.session.exec(select(User).where(User.id == user_id))).first()
+        if not user:
+            raise _user_not_found(user_id)
+
+        return _to_response(user)
+
+    async def get_user_projects(
+        self,
+        user_id: int,
+        limit: int = settings.PROJECTS_PAGE_SIZE,
+        after_id: Optional[int] = None,
+    ) -> List[ProjectResponse]:
+        statement = _projects_query(after_id, user_id, None, None).limit(limit)
+        projects = (await self.session.exec(statement)).all()
+        if not projects and not await self._user_exists(user_id):
+            raise _user_not_found(user_id)
+        return [_project_to_response(project) for project in projects]
+
+    async def count_user_projects(self, user_id: int) -> ProjectCount:
+        count = (await self.session.exec(_count_query(user_id))).one()
+        if not count and not await self._user_exists(user_id):
+            raise _user_not_found(user_id)
+        return ProjectCount(count=count)
+
+    async def _user_exists(self, user_id: int) -> bool:
+        return (await self.session.exec(_user_id_query(user_id))).first() is not None
+
+def _user_id_query(user_id: int):
+    return select(User.id).where(User.id == user_id)
+
+def _user_not_found(user_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"User with ID {user_id} not found",
+    )
+
+def _to_response(user: User) -> UserResponse:
+    return UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        created_at=user.created_at,
+    )
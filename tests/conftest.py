@@ -2,20 +2,43 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import SQLModel, Session, create_engine
 from sqlmodel.pool import StaticPool
+from contextlib import contextmanager
+from sqlalchemy import event
 import sys
 from pathlib import Path
 
 # Add the project root directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from main import app
-from core.db import get_session
+from api import async_auth_router, async_project_router, async_user_router
+from core.db import get_session, get_async_session
 from models.user import User
 from core.security import get_password_hash
+from core.rate_limit import auth_rate_limiter
+from core.jobs import job_queue
+from core.search import project_search_index
+from core.snapshot import project_snapshot
 from models.project import Project
 
-@pytest.fixture(name="client")
-def client_fixture():
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    # Every test client shares one IP; start each test with full buckets
+    auth_rate_limiter.reset()
+    yield
+
+@pytest.fixture(autouse=True)
+def reset_read_models():
+    # In-process read models load from whichever database reads them first
+    project_search_index.reset()
+    project_snapshot.reset()
+    yield
+
+@pytest.fixture(name="engine")
+def engine_fixture():
     # Create in-memory SQLite database for testing
     engine = create_engine(
         "sqlite://",
@@ -23,13 +46,18 @@ def client_fixture():
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
-    
+    return engine
+
+@pytest.fixture(name="client")
+def client_fixture(engine):
     # Override get_session dependency
     def get_test_session():
         with Session(engine) as session:
             yield session
     
     app.dependency_overrides[get_session] = get_test_session
+    # Without the lifespan the job queue runs deferred jobs inline
+    job_queue.bind = engine
     
     # Create test client
     client = TestClient(app)
@@ -37,6 +65,69 @@ def client_fixture():
     # Reset overrides after test is done
     yield client
     app.dependency_overrides.clear()
+    job_queue.bind = None
+
+@pytest.fixture(name="assert_num_queries")
+def assert_num_queries_fixture(engine):
+    """Context manager asserting how many SQL statements the block sends to the client engine."""
+    @contextmanager
+    def assert_num_queries(expected: int):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert len(statements) == expected, (
+            f"expected {expected} queries, got {len(statements)}:\n" + "\n".join(statements)
+        )
+
+    return assert_num_queries
+
+@pytest.fixture(name="login")
+def login_fixture():
+    """Register a user through the API and return bearer headers for it."""
+    def login(client: TestClient, username: str, role: str = "user", password: str = "password123"):
+        client.post(
+            "/api/v1/auth/register",
+            json={"username": username, "password": password, "role": role},
+        )
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"username": username, "password": password},
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return login
+
+@pytest.fixture(name="async_client")
+def async_client_fixture(tmp_path):
+    # aiosqlite opens its own connections, so share a file database between
+    # the sync engine that creates the schema and the async engine under test
+    database_path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    SQLModel.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+
+    async def get_test_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    # Serve the async routers the way main.py does when DB_ASYNC is on
+    async_app = FastAPI()
+    async_app.include_router(async_auth_router, prefix="/api/v1/auth")
+    async_app.include_router(async_project_router, prefix="/api/v1/project")
+    async_app.include_router(async_user_router, prefix="/api/v1/user")
+    async_app.dependency_overrides[get_async_session] = get_test_async_session
+
+    job_queue.bind = sync_engine
+    with TestClient(async_app) as client:
+        yield client
+    job_queue.bind = None
 
 @pytest.fixture(name="test_db")
 def test_db_fixture():
@@ -92,4 +183,40 @@ def test_project_fixture(test_db: Session, test_admin: User):
     test_db.add(project)
     test_db.commit()
     test_db.refresh(project)
-    return project
\ No newline at end of file
+    return project
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis the app uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        if ex is not None:
+            self.expiry[key] = ex
+        return True
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def expire(self, key, seconds):
+        self.expiry[key] = seconds
+        return key in self.data
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+            self.expiry.pop(key, None)
+        return removed
+
+@pytest.fixture(name="fake_redis")
+def fake_redis_fixture():
+    return FakeRedis()
@@ -0,0 +1,123 @@
+from fastapi.testclient import TestClient
+import json
+
+def test_async_register_and_login(async_client: TestClient):
+    response = async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "asyncuser", "password": "password123", "role": "user"},
+    )
+    assert response.status_code == 201
+    assert response.json()["username"] == "asyncuser"
+
+    response = async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "asyncuser", "password": "other", "role": "user"},
+    )
+    assert response.status_code == 400
+
+    response = async_client.post(
+        "/api/v1/auth/login",
+        json={"username": "asyncuser", "password": "wrong"},
+    )
+    assert response.status_code == 401
+
+def test_async_project_crud(async_client: TestClient, login):
+    admin_headers = login(async_client, "asyncadmin", role="admin")
+    user_headers = login(async_client, "asyncreader")
+
+    response = async_client.post(
+        "/api/v1/project/projects",
+        json={"name": "Async Project", "description": "Created async"},
+        headers=admin_headers
+    )
+    assert response.status_code == 201
+    project_id = response.json()["id"]
+
+    response = async_client.post(
+        "/api/v1/project/projects",
+        json={"name": "Not allowed"},
+        headers=user_headers
+    )
+    assert response.status_code == 403
+
+    response = async_client.put(
+        f"/api/v1/project/projects/{project_id}",
+        json={"name": "Async Updated"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Async Updated"
+
+    response = async_client.get("/api/v1/project/projects", headers=user_headers)
+    assert [project["name"] for project in response.json()] == ["Async Updated"]
+
+    response = async_client.get(
+        "/api/v1/project/projects", params={"stream": "true"}, headers=user_headers
+    )
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [project_id]
+
+    response = async_client.delete(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    assert response.status_code == 204
+    response = async_client.get(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    assert response.status_code == 404
+
+def test_async_batch_projects(async_client: TestClient, login):
+    headers = login(async_client, "asyncbatch", role="admin")
+
+    response = async_client.post(
+        "/api/v1/project/projects:batch",
+        json={"create": [{"name": "One"}, {"name": "Two"}]},
+        headers=headers
+    )
+    ids = [result["id"] for result in response.json()["results"]]
+
+    response = async_client.post(
+        "/api/v1/project/projects:batch",
+        json={"update": [{"id": ids[0], "description": "Updated"}], "delete": [ids[1]]},
+        headers=headers
+    )
+    assert [r["status_code"] for r in response.json()["results"]] == [200, 204]
+    response = async_client.get("/api/v1/project/projects", headers=headers)
+    assert [(p["name"], p["description"]) for p in response.json()] == [("One", "Updated")]
+
+def test_async_user_projects(async_client: TestClient, login):
+    headers = login(async_client, "asyncowner", role="admin")
+    response = async_client.post("/api/v1/project/projects", json={"name": "Owned"}, headers=headers)
+    owner_id = response.json()["owner_id"]
+
+    response = async_client.get(f"/api/v1/user/users/{owner_id}/projects", headers=headers)
+    assert [p["name"] for p in response.json()] == ["Owned"]
+    response = async_client.get(f"/api/v1/user/users/{owner_id}/projects/count", headers=headers)
+    assert response.json() == {"count": 1}
+    response = async_client.get("/api/v1/project/projects/count", headers=headers)
+    assert response.json() == {"count": 1}
+    response = async_client.get("/api/v1/user/users/999/projects", headers=headers)
+    assert response.status_code == 404
+
+def test_async_search_projects(async_client: TestClient, login):
+    headers = login(async_client, "asyncsearch", role="admin")
+    async_client.post("/api/v1/project/projects", json={"name": "Telemetry pipeline"}, headers=headers)
+    async_client.post("/api/v1/project/projects", json={"name": "Other", "description": "telemetry"}, headers=headers)
+
+    response = async_client.get("/api/v1/project/projects/search", params={"q": "tele"}, headers=headers)
+    assert [p["name"] for p in response.json()] == ["Telemetry pipeline", "Other"]
+
+def test_async_refresh_token(async_client: TestClient):
+    async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "asyncrefresh", "password": "password123"},
+    )
+    response = async_client.post(
+        "/api/v1/auth/login",
+        json={"username": "asyncrefresh", "password": "password123"},
+    )
+    first = response.json()["refresh_token"]
+
+    response = async_client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+
+    response = async_client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    response = async_client.post("/api/v1/auth/logout", json={"refresh_token": second})
+    assert response.status_code == 204
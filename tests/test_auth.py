@@ -1,5 +1,11 @@
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 import pytest
+import time
+from config.config import settings
+from core.dependencies import get_admin_user, get_current_active_user, get_current_user
+from core.user_state import UserStateCache, invalidate_user_state, user_state_cache
+from models.user import User
 
 def test_register_user(client: TestClient):
     response = client.post(
@@ -87,4 +93,112 @@ def test_login_invalid_credentials(client: TestClient):
         },
     )
     assert response.status_code == 401
-    assert "Incorrect username or password" in response.json()["detail"]
\ No newline at end of file
+    assert "Incorrect username or password" in response.json()["detail"]
+
+class _NoQuerySession:
+    def exec(self, statement):
+        raise AssertionError("stateless authentication must not query the database")
+
+class _UserSession:
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    def exec(self, statement):
+        self.queries += 1
+        return self
+
+    def first(self):
+        return self.user
+
+def test_stateless_auth_skips_user_lookup(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+    user_state_cache.clear()
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "statelessuser", "password": "password123", "role": "admin"},
+    )
+    token = client.post(
+        "/api/v1/auth/login",
+        json={"username": "statelessuser", "password": "password123"},
+    ).json()["access_token"]
+
+    user = get_current_user(token, _NoQuerySession())
+    assert user.username == "statelessuser"
+    assert user.role == "admin"
+    assert get_admin_user(get_current_active_user(user)) is user
+
+    # After invalidation the old token is checked against the database once
+    invalidate_user_state(user.id)
+    deactivated = User(id=user.id, username="statelessuser", role="admin", is_active=False, hashed_password="")
+    session = _UserSession(deactivated)
+    assert get_current_user(token, session).is_active is False
+    assert get_current_user(token, _NoQuerySession()).is_active is False
+    assert session.queries == 1
+    with pytest.raises(HTTPException):
+        get_current_active_user(get_current_user(token, _NoQuerySession()))
+    user_state_cache.clear()
+
+def test_stateless_claims_trusted_only_within_ttl():
+    cache = UserStateCache(maxsize=10, ttl=60, token_lifetime=3600)
+    claims = {"sub": "7", "username": "u", "role": "admin", "is_active": True}
+    assert cache.resolve({**claims, "iat": time.time()}).role == "admin"
+
+    # An hour-old token may carry a role revoked on another worker: ask the database
+    fresh = UserStateCache(maxsize=10, ttl=60, token_lifetime=3600)
+    assert fresh.resolve({**claims, "iat": time.time() - 3600}) is None
+
+def test_register_uses_single_statement(client: TestClient, assert_num_queries):
+    with assert_num_queries(1):
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"username": "oneshot", "password": "password123", "email": "oneshot@example.com"},
+        )
+    assert response.status_code == 201
+
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"username": "twoshot", "password": "password123", "email": "oneshot@example.com"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+def test_refresh_token_rotation(client: TestClient, assert_num_queries):
+    client.post("/api/v1/auth/register", json={"username": "refresher", "password": "password123"})
+    response = client.post("/api/v1/auth/login", json={"username": "refresher", "password": "password123"})
+    first = response.json()["refresh_token"]
+
+    # No password check: one lookup, the rotation and the new token's insert
+    with assert_num_queries(3):
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user"]["username"] == "refresher"
+    assert data["refresh_token"] != first
+    second = data["refresh_token"]
+
+    response = client.get(
+        "/api/v1/project/projects", headers={"Authorization": f"Bearer {data['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    # Reusing a rotated-out token revokes the whole family
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+def test_refresh_token_rejects_forgery_and_logout(client: TestClient):
+    client.post("/api/v1/auth/register", json={"username": "leaver", "password": "password123"})
+    response = client.post("/api/v1/auth/login", json={"username": "leaver", "password": "password123"})
+    token = response.json()["refresh_token"]
+    token_id = token.split(".")[0]
+
+    for forged in (f"{token_id}.not-the-secret", "malformed", "unknown.secret"):
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": forged})
+        assert response.status_code == 401
+
+    response = client.post("/api/v1/auth/logout", json={"refresh_token": token})
+    assert response.status_code == 204
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": token})
+    assert response.status_code == 401
@@ -0,0 +1,33 @@
+import json
+import pytest
+from benchmarks import calibrate_hash_cost, harness
+
+def test_parse_mix():
+    assert harness.parse_mix("get=3,list=1") == {"get": 3, "list": 1}
+    with pytest.raises(ValueError):
+        harness.parse_mix("explode=1")
+
+def test_compare_flags_regressions():
+    baseline = {"get": {"requests": 10, "p95_ms": 10.0, "queries_per_request": 2.0}}
+    faster = {"get": {"requests": 10, "p95_ms": 11.0, "queries_per_request": 2.0}}
+    slower = {"get": {"requests": 10, "p95_ms": 20.0, "queries_per_request": 3.0}}
+    assert harness.compare(faster, baseline, threshold=0.25) == []
+    assert len(harness.compare(slower, baseline, threshold=0.25)) == 2
+
+def test_harness_smoke(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    exit_code = harness.main([
+        "--users", "3", "--projects", "20", "--requests", "40", "--concurrency", "4",
+        "--write-baseline", str(baseline),
+    ])
+    assert exit_code == 0
+    report = json.loads(baseline.read_text())
+    assert report["total"]["requests"] == 40
+    assert report["get"]["queries_per_request"] == 2.0
+
+def test_calibrate_hash_cost():
+    rounds, timings = calibrate_hash_cost.calibrate(target_ms=10_000, samples=1, min_rounds=4, max_rounds=5)
+    assert rounds == 5
+    assert list(timings) == [4, 5]
+    # Each round doubles the work
+    assert timings[5] > timings[4]
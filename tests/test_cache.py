@@ -0,0 +1,116 @@
+from fastapi.testclient import TestClient
+import time
+import pytest
+from datetime import datetime, timedelta
+from schemas.project import ProjectResponse
+from core.cache import LRUCache, MemoryCacheBackend, RedisCacheBackend
+from core.http import http_date
+from services import project as project_module
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+@pytest.fixture(params=["memory", "redis"])
+def project_cache(request, fake_redis, monkeypatch):
+    if request.param == "memory":
+        backend = MemoryCacheBackend(maxsize=100, ttl=60)
+    else:
+        backend = RedisCacheBackend(fake_redis, ttl=60)
+    monkeypatch.setattr(project_module, "project_cache", backend)
+    return backend
+
+def test_project_cache_read_through_and_invalidation(client: TestClient, project_cache, login):
+    headers = login(client, "cacheadmin", role="admin")
+    project_id = client.post(
+        "/api/v1/project/projects",
+        json={"name": "Cached", "description": "v1"},
+        headers=headers
+    ).json()["id"]
+    assert project_cache.get(f"project:{project_id}") is not None
+
+    response = client.put(
+        f"/api/v1/project/projects/{project_id}",
+        json={"description": "v2"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    response = client.get(f"/api/v1/project/projects/{project_id}", headers=headers)
+    assert response.json()["description"] == "v2"
+
+    client.delete(f"/api/v1/project/projects/{project_id}", headers=headers)
+    assert project_module._cached_project(project_id) is None
+    response = client.get(f"/api/v1/project/projects/{project_id}", headers=headers)
+    assert response.status_code == 404
+
+def test_read_through_never_replaces_newer_entry(project_cache):
+    now = datetime.now()
+    newer = ProjectResponse(id=1, name="New", description=None, owner_id=1, created_at=now, updated_at=now)
+    older = newer.model_copy(update={"name": "Old", "updated_at": now - timedelta(seconds=1)})
+    project_module._cache_project(newer)
+    # A read that started before the update finishes after its write-through
+    project_module._fill_project_cache(older)
+    assert project_module._cached_project(1).name == "New"
+
+def test_read_through_never_revives_deleted_project(client: TestClient, project_cache, login):
+    headers = login(client, "raceadmin", role="admin")
+    project_id = client.post("/api/v1/project/projects", json={"name": "Doomed"}, headers=headers).json()["id"]
+    # A read fetches the row, then the project is deleted before it fills the cache
+    stale = project_module._cached_project(project_id)
+    client.delete(f"/api/v1/project/projects/{project_id}", headers=headers)
+    project_module._fill_project_cache(stale)
+
+    assert project_module._cached_project(project_id) is None
+    response = client.get(f"/api/v1/project/projects/{project_id}", headers=headers)
+    assert response.status_code == 404
+
+def test_project_conditional_get(client: TestClient, login):
+    headers = login(client, "etagadmin", role="admin")
+    project_id = client.post(
+        "/api/v1/project/projects",
+        json={"name": "Tagged"},
+        headers=headers
+    ).json()["id"]
+
+    response = client.get(f"/api/v1/project/projects/{project_id}", headers=headers)
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+    response = client.get(
+        f"/api/v1/project/projects/{project_id}",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(f"/api/v1/project/projects/{project_id}", json={"name": "Retagged"}, headers=headers)
+    response = client.get(
+        f"/api/v1/project/projects/{project_id}",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+@pytest.mark.skipif(not hasattr(time, "tzset"), reason="needs time.tzset")
+def test_last_modified_reads_naive_times_as_local(monkeypatch):
+    monkeypatch.setenv("TZ", "Etc/GMT-2")
+    time.tzset()
+    try:
+        assert http_date(datetime(2024, 1, 1, 12, 0)) == "Mon, 01 Jan 2024 10:00:00 GMT"
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+from core.compression import accepted_encodings
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert accepted_encodings("") == set()
+
+def test_large_listing_is_compressed(client: TestClient, login):
+    headers = login(client, "zipadmin", role="admin")
+    for i in range(30):
+        client.post("/api/v1/project/projects", json={"name": f"Zipped {i}", "description": "x" * 40}, headers=headers)
+
+    response = client.get("/api/v1/project/projects", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 30
+    # The compressed body gets a weak validator, which still matches on revalidation
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    response = client.get("/api/v1/project/projects", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/v1/project/projects", headers={**headers, "Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert not response.headers["ETag"].startswith("W/")
+
+    # Below COMPRESSION_MINIMUM_SIZE
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
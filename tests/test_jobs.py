@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+import asyncio
+from config.config import settings
+from core.jobs import JobQueue
+from models.background_job import BackgroundJob
+from models.user import User
+
+def test_job_queue_batches_and_retries(engine, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0)
+    queue = JobQueue(bind=engine)
+    batches = []
+
+    def flaky(session, payloads):
+        batches.append([payload["n"] for payload in payloads])
+        if len(batches) == 1:
+            raise RuntimeError("transient")
+
+    queue.register("flaky", flaky)
+
+    async def scenario():
+        await queue.start()
+        for n in range(5):
+            queue.defer("flaky", {"n": n})
+        await queue.stop(timeout=5)
+
+    asyncio.run(scenario())
+    # One batch, failed once and retried as a whole
+    assert batches == [[0, 1, 2, 3, 4], [0, 1, 2, 3, 4]]
+    stats = queue.stats()
+    assert stats["processed"] == 5
+    assert stats["retried"] == 5
+    assert stats["failed"] == 0
+
+def test_job_kind_batch_size(engine):
+    queue = JobQueue(bind=engine)
+    batches = []
+    queue.register("slow", lambda session, payloads: batches.append(len(payloads)), batch_size=1)
+
+    async def scenario():
+        await queue.start()
+        for n in range(3):
+            queue.defer("slow", {"n": n})
+        await queue.stop(timeout=5)
+
+    asyncio.run(scenario())
+    assert batches == [1, 1, 1]
+
+def test_durable_jobs_survive_restart(engine, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_QUEUE_DURABLE", True)
+    handled = []
+
+    async def crash():
+        queue = JobQueue(bind=engine)
+        queue.register("note", lambda session, payloads: handled.extend(payloads))
+        # No workers, so the process goes away with both jobs pending
+        await queue.start()
+        queue.defer("note", {"text": "kept"})
+        queue.defer("note", {"text": "secret"}, durable=False)
+        await queue.stop(timeout=0)
+
+    monkeypatch.setattr(settings, "JOB_QUEUE_WORKERS", 0)
+    asyncio.run(crash())
+    monkeypatch.setattr(settings, "JOB_QUEUE_WORKERS", 1)
+    assert handled == []
+    with Session(engine) as session:
+        assert len(session.exec(select(BackgroundJob)).all()) == 1
+
+    async def restart():
+        queue = JobQueue(bind=engine)
+        queue.register("note", lambda session, payloads: handled.extend(payloads))
+        await queue.start()
+        await queue.stop(timeout=5)
+
+    asyncio.run(restart())
+    assert handled == [{"text": "kept"}]
+    with Session(engine) as session:
+        assert session.exec(select(BackgroundJob)).all() == []
+
+def test_login_records_last_login(client: TestClient, engine):
+    client.post("/api/v1/auth/register", json={"username": "returning", "password": "password123"})
+    response = client.post("/api/v1/auth/login", json={"username": "returning", "password": "password123"})
+    assert response.status_code == 200
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.username == "returning")).one()
+        assert user.last_login_at is not None
+    assert client.get("/metrics/jobs").json()["processed"] >= 1
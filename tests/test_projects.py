@@ -1,5 +1,8 @@
 from fastapi.testclient import TestClient
+import json
 import pytest
+from config.config import settings
+from core.pagination import encode_cursor
 
 def get_auth_headers(client: TestClient, username: str, password: str):
     response = client.post(
@@ -264,4 +267,359 @@ def test_delete_project_user(client: TestClient):
     response = client.delete(f"/api/v1/project/projects/{project_id}", headers=user_headers)
     
     # Regular users shouldn't be able to delete projects
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def test_get_projects_paginated(client: TestClient):
+    # Register admin and create a few projects
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "pageadmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "pageadmin", "adminpass")
+    for i in range(5):
+        client.post(
+            "/api/v1/project/projects",
+            json={"name": f"Page Project {i}", "description": "Paged"},
+            headers=admin_headers
+        )
+
+    # Walk the pages using the cursor returned in the headers
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/project/projects", params=params, headers=admin_headers)
+        assert response.status_code == 200
+        seen.extend(project["name"] for project in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Page Project {i}" for i in range(5)]
+
+def test_get_projects_filters(client: TestClient):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "filteradmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "filteradmin", "adminpass")
+    client.post(
+        "/api/v1/project/projects",
+        json={"name": "Alpha 100%", "description": "First"},
+        headers=admin_headers
+    )
+    client.post(
+        "/api/v1/project/projects",
+        json={"name": "Beta", "description": "Second"},
+        headers=admin_headers
+    )
+
+    response = client.get(
+        "/api/v1/project/projects",
+        params={"name_prefix": "Alpha 100%"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert [project["name"] for project in response.json()] == ["Alpha 100%"]
+
+    response = client.get(
+        "/api/v1/project/projects",
+        params={"owner_id": 9999},
+        headers=admin_headers
+    )
+    assert response.json() == []
+
+    response = client.get(
+        "/api/v1/project/projects",
+        params={"cursor": "not-a-cursor"},
+        headers=admin_headers
+    )
+    assert response.status_code == 400
+
+def test_get_projects_cursor_out_of_range(client: TestClient, login):
+    headers = login(client, "rangeuser")
+    for position in (-1, 2**63, 2**70):
+        response = client.get(
+            "/api/v1/project/projects",
+            params={"cursor": encode_cursor(position)},
+            headers=headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+def test_get_projects_stream(client: TestClient):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "streamadmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "streamadmin", "adminpass")
+    for i in range(3):
+        client.post(
+            "/api/v1/project/projects",
+            json={"name": f"Stream Project {i}"},
+            headers=admin_headers
+        )
+
+    response = client.get(
+        "/api/v1/project/projects",
+        params={"stream": "true"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [project["name"] for project in lines] == [f"Stream Project {i}" for i in range(3)]
+
+def test_batch_projects(client: TestClient):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "batchadmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "batchadmin", "adminpass")
+
+    response = client.post(
+        "/api/v1/project/projects:batch",
+        json={"create": [{"name": f"Batch {i}", "description": "Imported"} for i in range(3)]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [201, 201, 201]
+    ids = [result["id"] for result in results]
+    assert [result["project"]["name"] for result in results] == ["Batch 0", "Batch 1", "Batch 2"]
+
+    response = client.post(
+        "/api/v1/project/projects:batch",
+        json={
+            "update": [{"id": ids[0], "name": "Renamed"}, {"id": 99999, "name": "Missing"}],
+            "delete": [ids[1], 99999],
+        },
+        headers=admin_headers
+    )
+    results = response.json()["results"]
+    assert [(r["action"], r["status_code"]) for r in results] == [
+        ("update", 404), ("update", 200), ("delete", 204), ("delete", 404)
+    ]
+    updated = next(r for r in results if r["status_code"] == 200)["project"]
+    assert updated["name"] == "Renamed"
+    assert updated["description"] == "Imported"
+
+    response = client.get("/api/v1/project/projects", headers=admin_headers)
+    assert sorted(project["name"] for project in response.json()) == ["Batch 2", "Renamed"]
+
+def test_batch_delete_repeated_id(client: TestClient, login):
+    headers = login(client, "repeatadmin", role="admin")
+    project_id = client.post("/api/v1/project/projects", json={"name": "Once"}, headers=headers).json()["id"]
+
+    response = client.post(
+        "/api/v1/project/projects:batch",
+        json={"delete": [project_id, project_id]},
+        headers=headers
+    )
+    assert [r["status_code"] for r in response.json()["results"]] == [204, 404]
+
+def test_batch_projects_user_permissions(client: TestClient):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "batchowner",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "batchuser",
+            "password": "userpass",
+            "role": "user"
+        },
+    )
+    admin_headers = get_auth_headers(client, "batchowner", "adminpass")
+    project_id = client.post(
+        "/api/v1/project/projects",
+        json={"name": "Owned by admin"},
+        headers=admin_headers
+    ).json()["id"]
+
+    user_headers = get_auth_headers(client, "batchuser", "userpass")
+    response = client.post(
+        "/api/v1/project/projects:batch",
+        json={
+            "create": [{"name": "Nope"}],
+            "update": [{"id": project_id, "name": "Nope"}],
+            "delete": [project_id],
+        },
+        headers=user_headers
+    )
+    assert response.status_code == 200
+    assert [r["status_code"] for r in response.json()["results"]] == [403, 403, 403]
+
+def test_batch_projects_size_limit(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "PROJECT_BATCH_MAX_SIZE", 2)
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "bigbatch",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "bigbatch", "adminpass")
+    response = client.post(
+        "/api/v1/project/projects:batch",
+        json={"create": [{"name": "a"}, {"name": "b"}], "delete": [1]},
+        headers=admin_headers
+    )
+    assert response.status_code == 413
+
+def test_project_writes_use_single_statement(client: TestClient, assert_num_queries):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "queryadmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "queryadmin", "adminpass")
+
+    # One user lookup for authentication plus one statement per write
+    with assert_num_queries(2):
+        project_id = client.post(
+            "/api/v1/project/projects",
+            json={"name": "Counted"},
+            headers=admin_headers
+        ).json()["id"]
+    with assert_num_queries(2):
+        response = client.put(
+            f"/api/v1/project/projects/{project_id}",
+            json={"name": "Counted again"},
+            headers=admin_headers
+        )
+    assert response.json()["name"] == "Counted again"
+    with assert_num_queries(2):
+        response = client.delete(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    assert response.status_code == 204
+
+def test_update_project_not_owner_forbidden(client: TestClient):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "owneradmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "notowner",
+            "password": "userpass",
+            "role": "user"
+        },
+    )
+    admin_headers = get_auth_headers(client, "owneradmin", "adminpass")
+    project_id = client.post(
+        "/api/v1/project/projects",
+        json={"name": "Not yours"},
+        headers=admin_headers
+    ).json()["id"]
+
+    user_headers = get_auth_headers(client, "notowner", "userpass")
+    response = client.put(
+        f"/api/v1/project/projects/{project_id}",
+        json={"name": "Mine now"},
+        headers=user_headers
+    )
+    assert response.status_code == 403
+    response = client.put(
+        "/api/v1/project/projects/99999",
+        json={"name": "Missing"},
+        headers=user_headers
+    )
+    assert response.status_code == 404
+
+def test_fast_json_matches_default_encoding(client: TestClient, monkeypatch):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "fastadmin",
+            "password": "adminpass",
+            "role": "admin"
+        },
+    )
+    admin_headers = get_auth_headers(client, "fastadmin", "adminpass")
+    for i in range(3):
+        project_id = client.post(
+            "/api/v1/project/projects",
+            json={"name": f"Fast {i}", "description": None if i else "Described"},
+            headers=admin_headers
+        ).json()["id"]
+
+    params = {"limit": 2}
+    default_list = client.get("/api/v1/project/projects", params=params, headers=admin_headers)
+    default_detail = client.get(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    default_stream = client.get("/api/v1/project/projects", params={"stream": "true"}, headers=admin_headers)
+
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    fast_list = client.get("/api/v1/project/projects", params=params, headers=admin_headers)
+    fast_detail = client.get(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    fast_stream = client.get("/api/v1/project/projects", params={"stream": "true"}, headers=admin_headers)
+
+    assert fast_list.json() == default_list.json()
+    assert fast_list.headers["X-Next-Cursor"] == default_list.headers["X-Next-Cursor"]
+    assert fast_detail.json() == default_detail.json()
+    assert fast_detail.headers["ETag"] == default_detail.headers["ETag"]
+    assert [json.loads(line) for line in fast_stream.text.splitlines()] == [
+        json.loads(line) for line in default_stream.text.splitlines()
+    ]
+
+def test_get_projects_collection_etag(client: TestClient, assert_num_queries):
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "etagadmin", "password": "adminpass", "role": "admin"},
+    )
+    admin_headers = get_auth_headers(client, "etagadmin", "adminpass")
+    project_id = client.post(
+        "/api/v1/project/projects", json={"name": "Tagged"}, headers=admin_headers
+    ).json()["id"]
+
+    response = client.get("/api/v1/project/projects", headers=admin_headers)
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+    # Unchanged: one aggregate query after the user lookup, no page read
+    with assert_num_queries(2):
+        response = client.get("/api/v1/project/projects", headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    client.put(f"/api/v1/project/projects/{project_id}", json={"name": "Retagged"}, headers=admin_headers)
+    response = client.get("/api/v1/project/projects", headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    etag = response.headers["ETag"]
+    client.delete(f"/api/v1/project/projects/{project_id}", headers=admin_headers)
+    response = client.get("/api/v1/project/projects", headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
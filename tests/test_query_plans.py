@@ -0,0 +1,44 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+import pytest
+from models.project import Project
+from models.user import User, UserRole
+from schemas.project import ProjectUpdate
+from services.project import _count_query, _delete_project, _projects_query, _update_project, _version_query
+
+OWNER = User(id=1, username="owner", hashed_password="", role=UserRole.USER)
+
+# updated_since is not listed: without STAT4 histograms SQLite cannot tell
+# how selective a range on updated_at is and prefers a rowid scan that
+# avoids sorting by id. Postgres picks ix_project_updated_at from its stats.
+SERVICE_QUERIES = {
+    "list by owner": _projects_query(None, 1, None, None),
+    "next owner page": _projects_query(500, 1, None, None),
+    "next page": _projects_query(500, None, None, None),
+    "name prefix": _projects_query(None, None, "alpha", None),
+    "count by owner": _count_query(1),
+    "collection version by owner": _version_query(1, None, None),
+    "get by id": select(Project).where(Project.id == 1),
+    "update owned": _update_project(1, ProjectUpdate(name="x"), OWNER),
+    "delete owned": _delete_project(1, OWNER),
+}
+
+def query_plan(engine, statement):
+    compiled = statement.compile(engine)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, parameters).all()
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize("name", SERVICE_QUERIES)
+def test_service_queries_avoid_table_scans(engine, name):
+    plan = query_plan(engine, SERVICE_QUERIES[name])
+    # "SCAN project" reads every row; index and primary key lookups are "SEARCH"
+    scans = [step for step in plan if step.startswith("SCAN project")]
+    assert not scans, f"{name}: {plan}"
+
+def test_name_prefix_range_is_not_sent_to_postgres(engine):
+    # Under a non-C collation "Jazz" sorts after the code point bound "Ja{"
+    for statement in (_projects_query(None, None, "Jaz", None), _version_query(None, "Jaz", None)):
+        assert ">=" not in str(statement.compile(dialect=postgresql.dialect()))
+        assert ">=" in str(statement.compile(engine))
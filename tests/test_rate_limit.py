@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+import time
+from config.config import settings
+from main import app
+from core.rate_limit import MemoryRateLimitStore, RedisRateLimitStore, auth_rate_limiter
+
+def test_memory_store_token_bucket():
+    store = MemoryRateLimitStore(maxsize=10)
+    assert store.take("key", capacity=2, per_second=50) == 0
+    assert store.take("key", capacity=2, per_second=50) == 0
+    wait = store.take("key", capacity=2, per_second=50)
+    assert 0 < wait <= 0.02
+    # Other keys have their own bucket
+    assert store.take("other", capacity=2, per_second=50) == 0
+
+    time.sleep(wait)
+    assert store.take("key", capacity=2, per_second=50) == 0
+
+def test_redis_store_shares_windows(fake_redis):
+    first, second = RedisRateLimitStore(fake_redis), RedisRateLimitStore(fake_redis)
+    assert first.take("key", capacity=2, per_second=1 / 30) == 0
+    assert second.take("key", capacity=2, per_second=1 / 30) == 0
+    assert 0 < first.take("key", capacity=2, per_second=1 / 30) <= 60
+    assert all(ttl == 60 for ttl in fake_redis.expiry.values())
+
+def test_login_throttled_before_lookup(client: TestClient, assert_num_queries, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_USERNAME_BURST", 2)
+    client.post("/api/v1/auth/register", json={"username": "target", "password": "rightpass"})
+
+    for _ in range(2):
+        response = client.post("/api/v1/auth/login", json={"username": "target", "password": "guess"})
+        assert response.status_code == 401
+
+    with assert_num_queries(0):
+        response = client.post("/api/v1/auth/login", json={"username": "TARGET", "password": "rightpass"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "bcrypt" not in response.headers["Server-Timing"]
+
+    # Other usernames from the same address are still allowed
+    response = client.post("/api/v1/auth/login", json={"username": "someone", "password": "guess"})
+    assert response.status_code == 401
+    assert auth_rate_limiter.stats() == {"allowed": 4, "throttled_ip": 0, "throttled_username": 1}
+
+def test_register_throttled_per_ip(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_IP_BURST", 2)
+    for name in ("first", "second"):
+        response = client.post("/api/v1/auth/register", json={"username": name, "password": "password"})
+        assert response.status_code == 201
+
+    response = client.post("/api/v1/auth/register", json={"username": "third", "password": "password"})
+    assert response.status_code == 429
+    assert client.get("/metrics/rate-limit").json()["throttled_ip"] == 1
+
+def test_zero_rate_turns_limit_off(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_IP_BURST", 1)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_IP_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_USERNAME_PER_MINUTE", 0)
+    for _ in range(3):
+        response = client.post("/api/v1/auth/login", json={"username": "nobody", "password": "guess"})
+        assert response.status_code == 401
+
+def test_spoofed_forwarded_for_keeps_ip_bucket(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_IP_BURST", 2)
+    # What serve.py runs: the test client's peer is not a trusted proxy
+    proxied = TestClient(ProxyHeadersMiddleware(app, trusted_hosts=settings.SERVER_FORWARDED_ALLOW_IPS))
+    statuses = [
+        proxied.post(
+            "/api/v1/auth/register",
+            json={"username": f"spoof{i}", "password": "password"},
+            headers={"X-Forwarded-For": f"203.0.113.{i}"},
+        ).status_code
+        for i in range(3)
+    ]
+    assert statuses == [201, 201, 429]
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+from config.config import settings
+from core import replicas as replica_routing
+from core.cache import MemoryCacheBackend
+from core.replicas import ReplicaSet
+from models.project import Project
+from services import project as project_service
+
+@pytest.fixture(name="replica_path")
+def replica_path_fixture(tmp_path):
+    path = tmp_path / "replica.db"
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    return path
+
+def use_replica(monkeypatch, replica_set: ReplicaSet) -> None:
+    monkeypatch.setattr(replica_routing, "replicas", replica_set)
+    monkeypatch.setattr(replica_routing, "_recent_writers", MemoryCacheBackend(maxsize=100, ttl=60))
+
+def seed_replica(path, name: str) -> None:
+    # Rows only the replica has tell which database served a read
+    with Session(create_engine(f"sqlite:///{path}")) as session:
+        now = datetime.now()
+        session.add(Project(name=name, owner_id=1, created_at=now, updated_at=now))
+        session.commit()
+
+def project_names(client: TestClient, headers):
+    response = client.get("/api/v1/project/projects", headers=headers)
+    assert response.status_code == 200
+    return [project["name"] for project in response.json()]
+
+def test_reads_use_replica_except_after_own_writes(client: TestClient, login, replica_path, monkeypatch):
+    use_replica(monkeypatch, ReplicaSet([create_engine(f"sqlite:///{replica_path}")]))
+    seed_replica(replica_path, "On replica")
+    admin = login(client, "replicaadmin", role="admin")
+    reader = login(client, "replicareader")
+
+    client.post("/api/v1/project/projects", json={"name": "On primary"}, headers=admin)
+    assert project_names(client, admin) == ["On primary"]
+    assert project_names(client, reader) == ["On replica"]
+    response = client.get("/api/v1/user/users/1/projects/count", headers=reader)
+    assert response.json() == {"count": 1}
+
+    # Once the read-your-writes window has passed, the writer reads from the replica too
+    replica_routing._recent_writers.delete(replica_routing._writer_key(1))
+    assert project_names(client, admin) == ["On replica"]
+
+def test_unreachable_replica_falls_back_to_primary(client: TestClient, login, tmp_path, monkeypatch):
+    unreachable = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    use_replica(monkeypatch, ReplicaSet([unreachable]))
+    monkeypatch.setattr(settings, "DB_REPLICA_HEALTH_CHECK_SECONDS", 0)
+    admin = login(client, "fallbackadmin", role="admin")
+    client.post("/api/v1/project/projects", json={"name": "On primary"}, headers=admin)
+    replica_routing._recent_writers.delete(replica_routing._writer_key(1))
+
+    assert project_names(client, admin) == ["On primary"]
+    assert replica_routing.replicas.status() == [{"healthy": False, "lag_seconds": None}]
+    replicas = client.get("/metrics/db-pool").json()["replicas"]
+    assert replicas[0]["healthy"] is False
+
+def test_async_reads_use_replica(async_client: TestClient, login, replica_path, monkeypatch):
+    replica_set = ReplicaSet(
+        [create_engine(f"sqlite:///{replica_path}")], [f"sqlite+aiosqlite:///{replica_path}"]
+    )
+    use_replica(monkeypatch, replica_set)
+    seed_replica(replica_path, "On replica")
+    admin = login(async_client, "asyncreplicaadmin", role="admin")
+    reader = login(async_client, "asyncreplicareader")
+
+    async_client.post("/api/v1/project/projects", json={"name": "On primary"}, headers=admin)
+    assert project_names(async_client, admin) == ["On primary"]
+    assert project_names(async_client, reader) == ["On replica"]
+
+def test_replica_reads_do_not_fill_project_cache(client: TestClient, login, replica_path, monkeypatch):
+    use_replica(monkeypatch, ReplicaSet([create_engine(f"sqlite:///{replica_path}")]))
+    monkeypatch.setattr(project_service, "project_cache", MemoryCacheBackend(maxsize=100, ttl=60))
+    seed_replica(replica_path, "Stale")
+    admin = login(client, "cacheadmin", role="admin")
+    reader = login(client, "cachereader")
+    project_id = client.post("/api/v1/project/projects", json={"name": "Fresh"}, headers=admin).json()["id"]
+    project_service.project_cache.delete(project_service._cache_key(project_id))
+
+    assert client.get(f"/api/v1/project/projects/{project_id}", headers=reader).json()["name"] == "Stale"
+    # The writer still sees their own write, not the replica's row
+    assert client.get(f"/api/v1/project/projects/{project_id}", headers=admin).json()["name"] == "Fresh"
@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from core.pagination import encode_cursor
+from core.search import ProjectSearchIndex, search_terms
+from models.project import Project
+from services.project import _search_query
+
+def search(client: TestClient, headers, q: str, **params):
+    response = client.get("/api/v1/project/projects/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return response
+
+def test_search_projects(client: TestClient, login):
+    headers = login(client, "searchadmin", role="admin")
+    for name, description in [
+        ("Billing service", "Invoices and payments"),
+        ("Payments gateway", "Card processing"),
+        ("Search UI", "Frontend for billing search"),
+    ]:
+        client.post("/api/v1/project/projects", json={"name": name, "description": description}, headers=headers)
+
+    # Name matches rank above description matches
+    names = [project["name"] for project in search(client, headers, "billing").json()]
+    assert names == ["Billing service", "Search UI"]
+    # Every word must match, the last one as a prefix
+    assert [project["name"] for project in search(client, headers, "card proc").json()] == ["Payments gateway"]
+    assert search(client, headers, "card billing").json() == []
+
+    # Pages follow the ranking
+    first = search(client, headers, "pay", limit=1)
+    second = search(client, headers, "pay", limit=1, cursor=first.headers["X-Next-Cursor"])
+    assert [first.json()[0]["name"], second.json()[0]["name"]] == ["Payments gateway", "Billing service"]
+
+    # Writes after the index is loaded are searchable right away
+    created = client.post(
+        "/api/v1/project/projects", json={"name": "Billing reports", "description": None}, headers=headers
+    ).json()
+    client.put(f"/api/v1/project/projects/{created['id']}", json={"name": "Ledger reports"}, headers=headers)
+    assert [project["name"] for project in search(client, headers, "ledger").json()] == ["Ledger reports"]
+    assert "Ledger reports" not in [project["name"] for project in search(client, headers, "billing").json()]
+    client.delete(f"/api/v1/project/projects/{created['id']}", headers=headers)
+    assert search(client, headers, "ledger").json() == []
+
+def test_search_rejects_negative_offset(client: TestClient, login):
+    headers = login(client, "offsetuser")
+    response = client.get(
+        "/api/v1/project/projects/search", params={"q": "any", "cursor": encode_cursor(-5)}, headers=headers
+    )
+    assert response.status_code == 400
+
+def test_search_index_replays_writes_made_during_load():
+    index = ProjectSearchIndex()
+    index.add(1, "Ignored", None)  # not loaded yet: the load will read it
+    index.begin_load()
+    index.add(2, "Rocket engine", None)
+    index.remove(1)
+    index.finish_load([(1, "Rocket fuel", None)])
+    assert index.search(search_terms("rocket"), limit=10) == [2]
+
+def test_postgres_search_uses_gin_index():
+    index = next(index for index in Project.__table__.indexes if index.name == "ix_project_search")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "USING gin" in ddl
+
+    sql = str(_search_query(search_terms("billing serv"), limit=10, offset=0).compile(dialect=postgresql.dialect()))
+    # The WHERE clause repeats the indexed expression exactly
+    assert ddl[ddl.index("(setweight"):].rstrip(")").replace("project.", "") in sql.replace("project.", "")
+    assert "@@ to_tsquery('simple'::regconfig" in sql
@@ -0,0 +1,137 @@
+from fastapi.testclient import TestClient
+from datetime import timedelta
+from jose import JWTError
+import asyncio
+import threading
+import time
+import pytest
+from passlib.hash import bcrypt
+from sqlmodel import Session, select
+from config.config import settings
+from core import security
+from core.exceptions import ServiceUnavailableException
+from models.user import User
+from core.security import (
+    PasswordHasherPool,
+    TokenCache,
+    create_access_token,
+    revoke_token,
+    verify_token,
+)
+
+def test_password_hasher_pool_rejects_when_full():
+    pool = PasswordHasherPool(workers=1, queue_size=1)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    queued = pool.submit(lambda: "queued")
+
+    with pytest.raises(ServiceUnavailableException) as exc_info:
+        pool.submit(lambda: "rejected")
+    assert exc_info.value.status_code == 503
+
+    release.set()
+    assert running.result() is True
+    assert queued.result() == "queued"
+    assert pool.pending == 0
+
+def test_login_rejected_when_hash_pool_full(client: TestClient, monkeypatch):
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "busyuser", "password": "password123", "role": "user"},
+    )
+    monkeypatch.setattr(security, "password_hasher", PasswordHasherPool(workers=1, queue_size=0))
+    release = threading.Event()
+    security.password_hasher.submit(release.wait)
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "busyuser", "password": "password123"},
+    )
+    release.set()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_password_hash_async_roundtrip():
+    async def roundtrip():
+        hashed = await security.get_password_hash_async("secret")
+        return await security.verify_password_async("secret", hashed)
+
+    assert asyncio.run(roundtrip()) is True
+
+def test_verify_token_uses_cache(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_ENABLED", True)
+    monkeypatch.setattr(security, "token_cache", TokenCache(maxsize=2))
+    token = create_access_token({"sub": "1"})
+
+    assert verify_token(token)["sub"] == "1"
+    assert verify_token(token)["sub"] == "1"
+    stats = security.token_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    # Mutating a returned payload must not leak into the cache
+    verify_token(token)["sub"] = "2"
+    assert verify_token(token)["sub"] == "1"
+
+def test_token_cache_evicts_on_size_and_expiry(monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_CACHE_ENABLED", True)
+    monkeypatch.setattr(security, "token_cache", TokenCache(maxsize=2))
+    tokens = [create_access_token({"sub": str(i)}) for i in range(3)]
+    for token in tokens:
+        verify_token(token)
+    assert security.token_cache.stats()["evictions"] == 1
+    assert security.token_cache.get(tokens[0]) is None
+
+    # Tokens are never cached past their exp claim
+    expired = create_access_token({"sub": "9"}, expires_delta=timedelta(seconds=-1))
+    security.token_cache.set(expired, {"sub": "9", "exp": time.time() - 1})
+    assert security.token_cache.get(expired) is None
+
+def test_revoked_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TokenCache(maxsize=10))
+    token = create_access_token({"sub": "1"})
+    verify_token(token)
+
+    revoke_token(token)
+    with pytest.raises(JWTError):
+        verify_token(token)
+
+def test_revocations_outlive_cache_size(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TokenCache(maxsize=2))
+    tokens = [create_access_token({"sub": str(user_id)}) for user_id in range(5)]
+    for token in tokens:
+        revoke_token(token)
+    # More revocations than cache entries: none of them is forgotten
+    assert all(security.token_cache.is_revoked(token) for token in tokens)
+
+    expired = create_access_token({"sub": "9"}, expires_delta=timedelta(seconds=-1))
+    revoke_token(expired)
+    assert security.token_cache.stats()["revoked"] == 5
+
+def login_and_fetch_hash(client: TestClient, engine, username: str, hashed_password: str) -> str:
+    with Session(engine) as session:
+        session.add(User(username=username, hashed_password=hashed_password))
+        session.commit()
+    response = client.post("/api/v1/auth/login", json={"username": username, "password": "oldsecret"})
+    assert response.status_code == 200
+    with Session(engine) as session:
+        return session.exec(select(User.hashed_password).where(User.username == username)).one()
+
+def test_login_upgrades_bcrypt_cost(client: TestClient, engine):
+    security.set_bcrypt_rounds(5)
+    try:
+        weak = bcrypt.using(rounds=4).hash("oldsecret")
+        assert security.password_needs_update(weak)
+        upgraded = login_and_fetch_hash(client, engine, "weakhash", weak)
+    finally:
+        security.set_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+    assert upgraded.startswith("$2b$05$")
+    assert security.verify_password("oldsecret", upgraded)
+
+def test_login_migrates_hash_scheme(client: TestClient, engine, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_SCHEMES", ["pbkdf2_sha256", "bcrypt"])
+    monkeypatch.setattr(security, "_pwd_context", None)
+    legacy = bcrypt.using(rounds=4).hash("oldsecret")
+    migrated = login_and_fetch_hash(client, engine, "legacyhash", legacy)
+    assert migrated.startswith("$pbkdf2-sha256$")
+    assert not security.password_needs_update(migrated)
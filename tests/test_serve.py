@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+import os
+import pytest
+import main
+import serve
+from config.config import settings
+
+@pytest.fixture(params=[4, 1])
+def launched(request, monkeypatch):
+    calls = {"migrations": 0}
+
+    def migrate():
+        calls["migrations"] += 1
+
+    def run(app, **options):
+        calls["app"] = app
+        calls["options"] = options
+        calls["worker_env"] = os.environ.get("DB_CREATE_TABLES")
+        calls["create_tables"] = settings.DB_CREATE_TABLES
+
+    monkeypatch.setattr(serve, "run_migrations", migrate)
+    monkeypatch.setattr(serve.uvicorn, "run", run)
+    monkeypatch.delenv("DB_CREATE_TABLES", raising=False)
+    monkeypatch.setattr(settings, "DB_CREATE_TABLES", True)
+    monkeypatch.setattr(settings, "SERVER_WORKERS", request.param)
+    monkeypatch.setattr(settings, "SERVER_LIMIT_CONCURRENCY", 200)
+    serve.main()
+    # main() hands the flag to the workers through the environment
+    monkeypatch.delenv("DB_CREATE_TABLES", raising=False)
+    return calls
+
+def test_launcher_migrates_once(launched):
+    assert launched["migrations"] == 1
+    assert launched["worker_env"] == "false"
+    # With one worker the app runs in this process, off the loaded settings
+    assert launched["create_tables"] is False
+    assert launched["app"] == "main:app"
+    assert launched["options"]["workers"] == settings.SERVER_WORKERS
+    assert launched["options"]["limit_concurrency"] == 200
+    assert launched["options"]["timeout_graceful_shutdown"] == settings.SERVER_GRACEFUL_TIMEOUT
+
+def test_workers_skip_table_creation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "create_db_and_tables", lambda: calls.append(1))
+    monkeypatch.setattr(settings, "DB_CREATE_TABLES", False)
+    with TestClient(main.app):
+        pass
+    assert calls == []
+
+def test_replicas_need_shared_read_your_writes(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ["postgresql://replica/app"])
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    with pytest.raises(SystemExit):
+        serve.check_settings()
+
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_BACKEND", "redis")
+    serve.check_settings()
@@ -0,0 +1,67 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete
+from config.config import settings
+from core.snapshot import project_snapshot
+from models.project import Project
+
+def list_pages(client: TestClient, headers, limit: int):
+    projects, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/project/projects", params=params, headers=headers)
+        assert response.status_code == 200
+        projects += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return projects
+
+def test_snapshot_pages_match_database(client: TestClient, login, monkeypatch, assert_num_queries):
+    headers = login(client, "snapadmin", role="admin")
+    for i in range(5):
+        client.post("/api/v1/project/projects", json={"name": f"Snap {i}", "description": "d" if i % 2 else None}, headers=headers)
+    expected = list_pages(client, headers, limit=2)
+
+    monkeypatch.setattr(settings, "PROJECT_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(settings, "PROJECT_SNAPSHOT_REFRESH_SECONDS", 60)
+    assert list_pages(client, headers, limit=2) == expected
+    assert project_snapshot.stats()["full_reloads"] == 1
+
+    # Fresh pages cost only the current user lookup
+    with assert_num_queries(1):
+        client.get("/api/v1/project/projects", params={"limit": 2}, headers=headers)
+
+    # Writes through the service show up without waiting for a refresh
+    first = expected[0]["id"]
+    client.put(f"/api/v1/project/projects/{first}", json={"name": "Renamed"}, headers=headers)
+    client.delete(f"/api/v1/project/projects/{expected[1]['id']}", headers=headers)
+    projects = list_pages(client, headers, limit=2)
+    assert [project["name"] for project in projects] == ["Renamed", "Snap 2", "Snap 3", "Snap 4"]
+
+def test_snapshot_picks_up_other_writers(client: TestClient, engine, login, monkeypatch):
+    headers = login(client, "snapadmin", role="admin")
+    owner_id = client.post("/api/v1/project/projects", json={"name": "Kept"}, headers=headers).json()["owner_id"]
+    monkeypatch.setattr(settings, "PROJECT_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(settings, "PROJECT_SNAPSHOT_REFRESH_SECONDS", 0)
+    assert [project["name"] for project in list_pages(client, headers, limit=10)] == ["Kept"]
+
+    # Another process inserts a row: found past the updated_at high-water mark
+    with Session(engine) as session:
+        now = datetime.now()
+        session.add(Project(name="External", owner_id=owner_id, created_at=now, updated_at=now))
+        session.commit()
+    assert [project["name"] for project in list_pages(client, headers, limit=10)] == ["Kept", "External"]
+
+    # ... and deletes one: the row count no longer matches, so it reloads
+    with Session(engine) as session:
+        session.exec(delete(Project).where(Project.name == "Kept"))
+        session.commit()
+    assert [project["name"] for project in list_pages(client, headers, limit=10)] == ["External"]
+    assert project_snapshot.stats()["full_reloads"] == 2
+
+def test_async_snapshot_pages(async_client: TestClient, login, monkeypatch):
+    headers = login(async_client, "snapadmin", role="admin")
+    for i in range(3):
+        async_client.post("/api/v1/project/projects", json={"name": f"Async {i}"}, headers=headers)
+    monkeypatch.setattr(settings, "PROJECT_SNAPSHOT_ENABLED", True)
+    assert [project["name"] for project in list_pages(async_client, headers, limit=2)] == ["Async 0", "Async 1", "Async 2"]
@@ -0,0 +1,53 @@
+from sqlmodel import create_engine
+from sqlalchemy import inspect
+from pathlib import Path
+import subprocess
+import sys
+from core import migrations
+from core.migrations import MIGRATIONS, applied_migrations, partition_projects, run_migrations
+
+ROOT = Path(__file__).parent.parent
+# Imported on first use rather than by `import main`, to keep startup short
+LAZY_MODULES = ("passlib", "bcrypt", "jose.jwt", "cryptography", "uvicorn")
+
+def test_import_keeps_heavy_modules_lazy():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            imported.add(line.split("|")[-1].strip())
+
+    assert "main" in imported
+    assert not [name for name in LAZY_MODULES if name in imported]
+
+def test_run_migrations(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    assert run_migrations(engine) == [version for version, _ in MIGRATIONS]
+    assert {"user", "project"} <= set(inspect(engine).get_table_names())
+
+    # Already applied: nothing left to do
+    assert run_migrations(engine) == []
+    assert applied_migrations(engine) == [version for version, _ in MIGRATIONS]
+
+def test_partition_projects_is_postgres_only(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partition.db'}")
+    run_migrations(engine)
+    with engine.begin() as conn:
+        assert partition_projects(conn, 16) is False
+    assert "project" in inspect(engine).get_table_names()
+
+def test_skipped_migration_stays_pending(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pending.db'}")
+    ready = {"value": False}
+    monkeypatch.setattr(migrations, "MIGRATIONS", [("0001_waits_for_setting", lambda conn: ready["value"])])
+    assert run_migrations(engine) == []
+    assert applied_migrations(engine) == []
+
+    ready["value"] = True
+    assert run_migrations(engine) == ["0001_waits_for_setting"]
@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+import pytest
+from config.config import settings
+from core.tracing import metrics
+
+def test_server_timing_header(client: TestClient, login):
+    headers = login(client, "traceuser")
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "traceuser", "password": "password123"},
+    )
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert "db;dur=" in timing
+    assert "bcrypt;dur=" in timing
+    assert "total;dur=" in timing
+
+    response = client.get("/api/v1/project/projects", headers=headers)
+    assert "jwt;dur=" in response.headers["Server-Timing"]
+    assert "serialize;dur=" in response.headers["Server-Timing"]
+
+def test_prometheus_metrics(client: TestClient, login):
+    metrics.reset()
+    login(client, "metricsuser")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="POST",route="/api/v1/auth/login",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/auth/login"} 1' in body
+    assert 'span_duration_seconds_count{span="bcrypt"} 2' in body
+    assert 'span_duration_seconds_count{span="db"}' in body
+    assert "token_cache_hits" in body
+
+def test_profiler_dumps_sampled_requests(client: TestClient, login, monkeypatch, tmp_path):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(settings, "PROFILE_EVERY_N_REQUESTS", 1)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+
+    login(client, "profileuser")
+    profiles = sorted(path.name for path in tmp_path.iterdir())
+    assert len(profiles) == 2
+    assert any("login" in name for name in profiles)
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from config.config import settings
+from models.user import User
+
+def test_user_projects_and_counts(client: TestClient, engine, login):
+    admin_headers = login(client, "owneradmin", role="admin")
+    other_headers = login(client, "otheradmin", role="admin")
+    reader_headers = login(client, "reader")
+    with Session(engine) as session:
+        reader_id = session.exec(select(User.id).where(User.username == "reader")).one()
+
+    for i in range(3):
+        admin_id = client.post(
+            "/api/v1/project/projects", json={"name": f"Mine {i}"}, headers=admin_headers
+        ).json()["owner_id"]
+    other_id = client.post(
+        "/api/v1/project/projects", json={"name": "Theirs"}, headers=other_headers
+    ).json()["owner_id"]
+
+    response = client.get(f"/api/v1/user/users/{admin_id}/projects?limit=2", headers=reader_headers)
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Mine 0", "Mine 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        f"/api/v1/user/users/{admin_id}/projects", params={"limit": 2, "cursor": cursor}, headers=reader_headers
+    )
+    assert [p["name"] for p in response.json()] == ["Mine 2"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(f"/api/v1/user/users/{admin_id}/projects/count", headers=reader_headers)
+    assert response.json() == {"count": 3}
+    response = client.get(f"/api/v1/user/users/{reader_id}/projects/count", headers=reader_headers)
+    assert response.json() == {"count": 0}
+    response = client.get(f"/api/v1/user/users/{reader_id}/projects", headers=reader_headers)
+    assert response.json() == []
+
+    response = client.get("/api/v1/project/projects/count", headers=reader_headers)
+    assert response.json() == {"count": 4}
+    response = client.get(f"/api/v1/project/projects/count?owner_id={other_id}", headers=reader_headers)
+    assert response.json() == {"count": 1}
+
+def test_user_projects_unknown_user(client: TestClient, login):
+    headers = login(client, "lonely")
+
+    response = client.get("/api/v1/user/users/999/projects", headers=headers)
+    assert response.status_code == 404
+    response = client.get("/api/v1/user/users/999/projects/count", headers=headers)
+    assert response.status_code == 404
+
+def test_user_projects_fast_json(client: TestClient, login, monkeypatch):
+    headers = login(client, "fastadmin", role="admin")
+    for i in range(3):
+        admin_id = client.post(
+            "/api/v1/project/projects", json={"name": f"Fast {i}"}, headers=headers
+        ).json()["owner_id"]
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+
+    response = client.get(f"/api/v1/user/users/{admin_id}/projects?limit=2", headers=headers)
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Fast 0", "Fast 1"]
+    assert "X-Next-Cursor" in response.headers